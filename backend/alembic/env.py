@@ -17,8 +17,8 @@ from app.core.database import Base
 # Importar todos os models para que o Alembic os reconheça
 from app.users.models import User
 from app.accounts.models import Account, CreditCard
-from app.transactions.models import Transaction, Category
-from app.investments.models import InvestmentPortfolio, InvestmentEntry
+from app.transactions.models import Transaction, Category, MonthlyUserCategoryTotal
+from app.investments.models import InvestmentPortfolio, InvestmentEntry, InvestmentValuation
 from app.indicators import Indicator
 from app.integrations import BankIntegration, WhatsAppSettings
 
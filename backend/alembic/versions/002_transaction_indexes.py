@@ -0,0 +1,69 @@
+"""Composite and partial indexes for transaction queries
+
+Revision ID: 002_transaction_indexes
+Revises: 001_initial
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '002_transaction_indexes'
+down_revision: Union[str, None] = '001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE = sa.text("status <> 'cancelled'")
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    with op.get_context().autocommit_block():
+        # Listagem: filtro por usuário + ORDER BY date DESC, created_at DESC, id DESC
+        op.create_index(
+            'ix_transactions_user_date_created', 'transactions',
+            ['user_id', sa.text('date DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+        # Totais por tipo e por categoria: usuário + tipo + intervalo de datas
+        op.create_index(
+            'ix_transactions_user_type_date_active', 'transactions',
+            ['user_id', 'type', 'date'],
+            postgresql_include=['amount', 'category_id'],
+            postgresql_where=ACTIVE,
+            postgresql_concurrently=True,
+        )
+        # Fluxo diário: usuário + intervalo de datas, agrupado por (date, type)
+        op.create_index(
+            'ix_transactions_user_date_active', 'transactions',
+            ['user_id', 'date'],
+            postgresql_include=['type', 'amount'],
+            postgresql_where=ACTIVE,
+            postgresql_concurrently=True,
+        )
+        # Saldo da conta: SUM por tipo de uma conta
+        op.create_index(
+            'ix_transactions_account_type_active', 'transactions',
+            ['account_id', 'type'],
+            postgresql_include=['amount'],
+            postgresql_where=ACTIVE,
+            postgresql_concurrently=True,
+        )
+        # Fatura do cartão: lançamentos ativos do cartão por data
+        op.create_index(
+            'ix_transactions_card_date_active', 'transactions',
+            ['credit_card_id', 'date'],
+            postgresql_include=['type', 'amount'],
+            postgresql_where=ACTIVE,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_transactions_card_date_active', table_name='transactions', postgresql_concurrently=True)
+        op.drop_index('ix_transactions_account_type_active', table_name='transactions', postgresql_concurrently=True)
+        op.drop_index('ix_transactions_user_date_active', table_name='transactions', postgresql_concurrently=True)
+        op.drop_index('ix_transactions_user_type_date_active', table_name='transactions', postgresql_concurrently=True)
+        op.drop_index('ix_transactions_user_date_created', table_name='transactions', postgresql_concurrently=True)
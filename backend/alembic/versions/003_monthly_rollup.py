@@ -0,0 +1,69 @@
+"""Monthly per-user rollup of transaction totals
+
+Revision ID: 003_monthly_rollup
+Revises: 002_transaction_indexes
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '003_monthly_rollup'
+down_revision: Union[str, None] = '002_transaction_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NIL_UUID = "'00000000-0000-0000-0000-000000000000'::uuid"
+
+# Linhas do rollup calculadas das transações. 'cancelled' é o rótulo que o ORM
+# grava para TransactionStatus.CANCELLED (Enum com values_callable=enum_values),
+# o mesmo critério de MonthlyRollupRepository.contribution.
+ROLLUP_SELECT = """
+    SELECT user_id, date_trunc('month', date)::date AS month, type,
+           category_id, account_id, credit_card_id, SUM(amount) AS total, COUNT(*) AS count
+    FROM transactions
+    WHERE status <> 'cancelled'
+    GROUP BY user_id, date_trunc('month', date)::date, type, category_id, account_id, credit_card_id
+"""
+
+
+def upgrade() -> None:
+    op.create_table('monthly_user_category_totals',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('type', postgresql.ENUM('income', 'expense', name='transactiontype', create_type=False), nullable=False),
+        sa.Column('category_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('account_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('credit_card_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('total', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['credit_card_id'], ['credit_cards.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ux_monthly_user_category_totals_key', 'monthly_user_category_totals',
+        [
+            'user_id', 'month', 'type',
+            sa.text(f'COALESCE(category_id, {NIL_UUID})'),
+            sa.text(f'COALESCE(account_id, {NIL_UUID})'),
+            sa.text(f'COALESCE(credit_card_id, {NIL_UUID})'),
+        ],
+        unique=True,
+    )
+
+    # Carga inicial a partir das transações existentes
+    op.execute(f"""
+        INSERT INTO monthly_user_category_totals
+            (id, user_id, month, type, category_id, account_id, credit_card_id, total, count)
+        SELECT gen_random_uuid(), r.* FROM ({ROLLUP_SELECT}) AS r
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_monthly_user_category_totals_key', table_name='monthly_user_category_totals')
+    op.drop_table('monthly_user_category_totals')
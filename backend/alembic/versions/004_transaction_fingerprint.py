@@ -0,0 +1,71 @@
+"""Transaction fingerprint for import de-duplication
+
+Revision ID: 004_transaction_fingerprint
+Revises: 003_monthly_rollup
+Create Date: 2026-10-18 00:00:00.000000
+"""
+import hashlib
+import re
+import unicodedata
+from decimal import Decimal
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '004_transaction_fingerprint'
+down_revision: Union[str, None] = '003_monthly_rollup'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 5000
+
+
+def _fingerprint(source, tx_date, amount, description) -> str:
+    # Cópia de app.transactions.models.transaction_fingerprint (migrations não importam o app)
+    text = unicodedata.normalize("NFKD", description)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"\s+", " ", text).strip().lower()
+    key = "|".join([
+        str(source),
+        tx_date.isoformat(),
+        str(Decimal(amount).quantize(Decimal("0.01"))),
+        text,
+    ])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column('transactions', sa.Column('fingerprint', sa.String(length=64), nullable=True))
+
+    # Backfill em lotes por id (keyset), com UPDATE em executemany
+    conn = op.get_bind()
+    select = sa.text(
+        "SELECT id, COALESCE(account_id, credit_card_id) AS source, date, amount, description "
+        "FROM transactions WHERE fingerprint IS NULL AND id > :last ORDER BY id LIMIT :limit"
+    )
+    update = sa.text("UPDATE transactions SET fingerprint = :fingerprint WHERE id = :id")
+    last = '00000000-0000-0000-0000-000000000000'
+    while True:
+        rows = conn.execute(select, {"last": last, "limit": BATCH_SIZE}).all()
+        if not rows:
+            break
+        conn.execute(update, [
+            {"id": row.id, "fingerprint": _fingerprint(row.source, row.date, row.amount, row.description)}
+            for row in rows
+        ])
+        last = rows[-1].id
+
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transactions_user_fingerprint', 'transactions',
+            ['user_id', 'fingerprint'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_transactions_user_fingerprint', table_name='transactions', postgresql_concurrently=True)
+    op.drop_column('transactions', 'fingerprint')
@@ -0,0 +1,36 @@
+"""Manual valuation snapshots for investment portfolios
+
+Revision ID: 005_investment_valuations
+Revises: 004_transaction_fingerprint
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '005_investment_valuations'
+down_revision: Union[str, None] = '004_transaction_fingerprint'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('investment_valuations',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('portfolio_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('value', sa.Numeric(15, 2), nullable=False),
+        sa.Column('description', sa.String(255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['portfolio_id'], ['investment_portfolios.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        # Uma avaliação por carteira e dia; o índice também atende a leitura ordenada por data
+        sa.UniqueConstraint('portfolio_id', 'date', name='uq_investment_valuations_portfolio_date')
+    )
+    op.create_index('ix_investment_valuations_id', 'investment_valuations', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_investment_valuations_id', table_name='investment_valuations')
+    op.drop_table('investment_valuations')
@@ -0,0 +1,32 @@
+"""Composite index for paginated investment entry listing
+
+Revision ID: 006_investment_entry_indexes
+Revises: 005_investment_valuations
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '006_investment_entry_indexes'
+down_revision: Union[str, None] = '005_investment_valuations'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    with op.get_context().autocommit_block():
+        # Listagem: filtro por carteira + ORDER BY date DESC, created_at DESC, id DESC
+        # (keyset); type/amount no INCLUDE atendem os totais por período só pelo índice
+        op.create_index(
+            'ix_investment_entries_portfolio_date', 'investment_entries',
+            ['portfolio_id', sa.text('date DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_include=['type', 'amount'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_investment_entries_portfolio_date', table_name='investment_entries', postgresql_concurrently=True)
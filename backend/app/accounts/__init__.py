@@ -12,6 +12,8 @@ from app.accounts.schemas import (
     CreditCardUpdate,
     CreditCardResponse,
     CreditCardListResponse,
+    CreditCardInvoice,
+    CreditCardInvoiceListResponse,
 )
 from app.accounts.repository import AccountRepository, CreditCardRepository
 from app.accounts.service import AccountService, CreditCardService
@@ -29,6 +31,8 @@ __all__ = [
     "CreditCardUpdate",
     "CreditCardResponse",
     "CreditCardListResponse",
+    "CreditCardInvoice",
+    "CreditCardInvoiceListResponse",
     "AccountRepository",
     "CreditCardRepository",
     "AccountService",
@@ -0,0 +1,96 @@
+"""
+Ciclos de fatura de cartão de crédito.
+
+Cada fatura é identificada pelo mês de referência (primeiro dia do mês em que
+fecha). A fatura do mês M cobre as compras de `fechamento(M-1)` até a véspera
+de `fechamento(M)`: compras feitas no dia do fechamento já caem na fatura
+seguinte. Dias de fechamento/vencimento maiores que o mês (ex: 31 em
+fevereiro) usam o último dia do mês.
+
+`invoice_month_expr` reproduz `invoice_month` em SQL, para agrupar as
+transações por cartão e ciclo em uma única consulta.
+"""
+
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, timedelta
+from enum import Enum as PyEnum
+
+from sqlalchemy import Date, case, cast, extract, func, literal_column
+
+from app.core.dates import shift_month
+
+
+class InvoiceStatus(str, PyEnum):
+    """Situação da fatura em relação a hoje."""
+    CLOSED = "closed"      # Já fechou (a pagar ou paga)
+    OPEN = "open"          # Ciclo em andamento
+    UPCOMING = "upcoming"  # Ciclo futuro (ex: compras lançadas adiante)
+
+
+@dataclass
+class BillingCycle:
+    """Datas de um ciclo de fatura."""
+
+    reference_month: date
+    period_start: date   # Primeiro dia de compras
+    period_end: date     # Último dia de compras (véspera do fechamento)
+    closing_date: date
+    due_date: date
+
+    def status(self, today: date) -> InvoiceStatus:
+        if self.closing_date <= today:
+            return InvoiceStatus.CLOSED
+        if self.period_start <= today:
+            return InvoiceStatus.OPEN
+        return InvoiceStatus.UPCOMING
+
+
+def _day_in_month(month_start: date, day: int) -> date:
+    return month_start.replace(day=min(day, monthrange(month_start.year, month_start.month)[1]))
+
+
+def invoice_month(tx_date: date, closing_day: int) -> date:
+    """Mês de referência da fatura em que cai uma compra feita em `tx_date`."""
+    month_start = tx_date.replace(day=1)
+    if tx_date >= _day_in_month(month_start, closing_day):
+        return shift_month(month_start, 1)
+    return month_start
+
+
+def billing_cycle(reference_month: date, closing_day: int, due_day: int) -> BillingCycle:
+    """Datas da fatura do mês de referência."""
+    closing = _day_in_month(reference_month, closing_day)
+    start = _day_in_month(shift_month(reference_month, -1), closing_day)
+    # Vencimento depois do fechamento no mesmo mês, senão no mês seguinte
+    due_month = reference_month if due_day > closing_day else shift_month(reference_month, 1)
+    return BillingCycle(
+        reference_month=reference_month,
+        period_start=start,
+        period_end=closing - timedelta(days=1),
+        closing_date=closing,
+        due_date=_day_in_month(due_month, due_day),
+    )
+
+
+_ONE_MONTH = literal_column("INTERVAL '1 month'")
+_ONE_DAY = literal_column("INTERVAL '1 day'")
+
+
+def next_month_expr(month_column):
+    """Mês seguinte a uma expressão SQL de início de mês."""
+    return cast(month_column + _ONE_MONTH, Date)
+
+
+def invoice_month_expr(date_column, closing_day_column):
+    """Versão SQL de `invoice_month` (PostgreSQL), para GROUP BY por ciclo."""
+    month_start = func.date_trunc("month", date_column)
+    days_in_month = extract("day", month_start + _ONE_MONTH - _ONE_DAY)
+    closing = func.least(closing_day_column, days_in_month)
+    return cast(
+        case(
+            (extract("day", date_column) >= closing, month_start + _ONE_MONTH),
+            else_=month_start,
+        ),
+        Date,
+    )
@@ -10,7 +10,7 @@ from sqlalchemy import Column, String, Boolean, DateTime, Numeric, Integer, Fore
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
-from app.core.database import Base
+from app.core.database import Base, enum_values
 
 
 class AccountType(str, PyEnum):
@@ -48,7 +48,7 @@ class Account(Base):
         nullable=False,
     )
     type = Column(
-        Enum(AccountType),
+        Enum(AccountType, values_callable=enum_values),
         nullable=False,
         default=AccountType.CHECKING,
     )
@@ -2,13 +2,15 @@
 Repository de Contas e Cartões - Camada de acesso a dados.
 """
 
-from typing import List, Optional
+from datetime import date
+from typing import List, Optional, Tuple
 from uuid import UUID
 from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Date, and_, case, func, literal
 
 from app.accounts.models import Account, CreditCard, AccountType
+from app.accounts.invoices import invoice_month_expr, next_month_expr
 
 
 class AccountRepository:
@@ -47,6 +49,21 @@ class AccountRepository:
         )
         return result or Decimal("0.00")
     
+    def get_balance_summary(self, user_id: UUID) -> dict:
+        """Retorna saldo total e quantidade das contas ativas em uma consulta."""
+        row = (
+            self.db.query(
+                func.sum(Account.current_balance).label("total_balance"),
+                func.count(Account.id).label("account_count"),
+            )
+            .filter(Account.user_id == user_id, Account.is_active == True)
+            .one()
+        )
+        return {
+            "total_balance": row.total_balance or Decimal("0.00"),
+            "account_count": row.account_count or 0,
+        }
+    
     def create(self, account: Account) -> Account:
         """Cria nova conta."""
         self.db.add(account)
@@ -65,6 +82,13 @@ class AccountRepository:
         self.db.delete(account)
         self.db.commit()
     
+    def adjust_balance(self, account_id: UUID, delta: Decimal) -> None:
+        """Soma `delta` ao saldo da conta no próprio banco (sem commit)."""
+        self.db.query(Account).filter(Account.id == account_id).update(
+            {"current_balance": Account.current_balance + delta},
+            synchronize_session=False,
+        )
+    
     def update_balance(self, account_id: UUID, new_balance: Decimal) -> None:
         """Atualiza saldo da conta."""
         self.db.query(Account).filter(Account.id == account_id).update(
@@ -100,6 +124,66 @@ class CreditCardRepository:
         
         return query.order_by(CreditCard.name).all()
     
+    def get_all_with_usage(
+        self,
+        user_id: UUID,
+        today: date,
+        include_inactive: bool = False,
+        card_id: Optional[UUID] = None,
+    ) -> List[Tuple[CreditCard, dict]]:
+        """
+        Lista os cartões com faturas e uso do limite, em uma única consulta.
+        
+        Agrupa as transações de todos os cartões (LEFT JOIN, então cartões
+        sem lançamentos também aparecem), com somas condicionais:
+        
+        - `current_invoice`: ciclo aberto em `today` (despesas - estornos)
+        - `next_invoice`: ciclo seguinte
+        - `outstanding`: despesas pendentes de qualquer ciclo (comprometem o limite)
+        
+        O número de consultas não depende da quantidade de cartões.
+        """
+        # Import aqui para evitar circular import
+        from app.transactions.models import Transaction, TransactionType, TransactionStatus
+        
+        tx_month = invoice_month_expr(Transaction.date, CreditCard.closing_day)
+        current_month = invoice_month_expr(literal(today, Date), CreditCard.closing_day)
+        is_expense = Transaction.type == TransactionType.EXPENSE
+        signed = case((is_expense, Transaction.amount), else_=-Transaction.amount)
+        zero = Decimal("0.00")
+        
+        query = (
+            self.db.query(
+                CreditCard,
+                func.coalesce(func.sum(case((tx_month == current_month, signed), else_=0)), zero).label("current_invoice"),
+                func.coalesce(func.sum(case((tx_month == next_month_expr(current_month), signed), else_=0)), zero).label("next_invoice"),
+                func.coalesce(func.sum(case(
+                    (and_(is_expense, Transaction.status == TransactionStatus.PENDING), Transaction.amount),
+                    else_=0,
+                )), zero).label("outstanding"),
+            )
+            .outerjoin(Transaction, and_(
+                Transaction.credit_card_id == CreditCard.id,
+                Transaction.status != TransactionStatus.CANCELLED,
+            ))
+            .filter(CreditCard.user_id == user_id)
+        )
+        if not include_inactive:
+            query = query.filter(CreditCard.is_active == True)
+        if card_id is not None:
+            query = query.filter(CreditCard.id == card_id)
+        
+        rows = query.group_by(CreditCard.id).order_by(CreditCard.name).all()
+        
+        return [
+            (row.CreditCard, {
+                "current_invoice": row.current_invoice,
+                "next_invoice": row.next_invoice,
+                "outstanding": row.outstanding,
+            })
+            for row in rows
+        ]
+    
     def get_total_limit(self, user_id: UUID) -> Decimal:
         """Calcula limite total de todos os cartões do usuário."""
         result = (
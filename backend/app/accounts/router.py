@@ -3,11 +3,12 @@ Router de Contas e Cartões de Crédito.
 Define endpoints CRUD para gestão financeira.
 """
 
+from decimal import Decimal
 from typing import List
 from uuid import UUID
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, status
 
-from app.core.dependencies import CurrentUser, DatabaseSession
+from app.core.dependencies import CurrentUser, DatabaseSession, ETagCheck
 from app.accounts.service import AccountService, CreditCardService
 from app.accounts.schemas import (
     AccountCreate,
@@ -18,12 +19,13 @@ from app.accounts.schemas import (
     CreditCardUpdate,
     CreditCardResponse,
     CreditCardListResponse,
+    CreditCardInvoiceListResponse,
 )
 
 
 # Routers
-accounts_router = APIRouter(prefix="/accounts", tags=["Contas"])
-credit_cards_router = APIRouter(prefix="/credit-cards", tags=["Cartões de Crédito"])
+accounts_router = APIRouter(prefix="/accounts", tags=["Contas"], dependencies=[ETagCheck])
+credit_cards_router = APIRouter(prefix="/credit-cards", tags=["Cartões de Crédito"], dependencies=[ETagCheck])
 
 
 # ===========================================
@@ -36,7 +38,7 @@ credit_cards_router = APIRouter(prefix="/credit-cards", tags=["Cartões de Créd
     summary="Listar contas",
     description="Lista todas as contas do usuário.",
 )
-async def list_accounts(
+def list_accounts(
     current_user: CurrentUser,
     db: DatabaseSession,
     include_inactive: bool = False,
@@ -64,7 +66,7 @@ async def list_accounts(
     summary="Criar conta",
     description="Cria uma nova conta para o usuário.",
 )
-async def create_account(
+def create_account(
     data: AccountCreate,
     current_user: CurrentUser,
     db: DatabaseSession,
@@ -91,7 +93,7 @@ async def create_account(
     summary="Detalhe da conta",
     description="Retorna detalhes de uma conta específica.",
 )
-async def get_account(
+def get_account(
     account_id: UUID,
     current_user: CurrentUser,
     db: DatabaseSession,
@@ -109,7 +111,7 @@ async def get_account(
     summary="Atualizar conta",
     description="Atualiza uma conta existente.",
 )
-async def update_account(
+def update_account(
     account_id: UUID,
     data: AccountUpdate,
     current_user: CurrentUser,
@@ -128,7 +130,7 @@ async def update_account(
     summary="Excluir conta",
     description="Remove uma conta do sistema.",
 )
-async def delete_account(
+def delete_account(
     account_id: UUID,
     current_user: CurrentUser,
     db: DatabaseSession,
@@ -152,7 +154,7 @@ async def delete_account(
     summary="Listar cartões",
     description="Lista todos os cartões de crédito do usuário.",
 )
-async def list_credit_cards(
+def list_credit_cards(
     current_user: CurrentUser,
     db: DatabaseSession,
     include_inactive: bool = False,
@@ -163,24 +165,28 @@ async def list_credit_cards(
     - **include_inactive**: Se True, inclui cartões inativos
     """
     service = CreditCardService(db)
-    cards = service.get_all(current_user.id, include_inactive)
-    total_limit = service.get_total_limit(current_user.id)
     
-    # Enriquecer com dados calculados
-    card_responses = []
-    for card in cards:
-        response = CreditCardResponse.model_validate(card)
-        response.current_invoice = service.get_current_invoice(card.id, current_user.id)
-        response.available_limit = card.limit - (response.current_invoice or 0)
-        card_responses.append(response)
+    # Cartões, faturas e uso do limite em uma única consulta
+    rows = service.get_all_with_usage(current_user.id, include_inactive)
+    card_responses = [_card_response(card, usage) for card, usage in rows]
+    total_limit = sum((card.limit for card, _ in rows if card.is_active), Decimal("0.00"))
     
     return CreditCardListResponse(
         cards=card_responses,
-        total=len(cards),
+        total=len(card_responses),
         total_limit=total_limit,
     )
 
 
+def _card_response(card, usage: dict) -> CreditCardResponse:
+    response = CreditCardResponse.model_validate(card)
+    response.current_invoice = usage["current_invoice"]
+    response.next_invoice = usage["next_invoice"]
+    response.available_limit = usage["available_limit"]
+    response.utilization = usage["utilization"]
+    return response
+
+
 @credit_cards_router.post(
     "",
     response_model=CreditCardResponse,
@@ -188,7 +194,7 @@ async def list_credit_cards(
     summary="Criar cartão",
     description="Cria um novo cartão de crédito.",
 )
-async def create_credit_card(
+def create_credit_card(
     data: CreditCardCreate,
     current_user: CurrentUser,
     db: DatabaseSession,
@@ -211,20 +217,41 @@ async def create_credit_card(
     summary="Detalhe do cartão",
     description="Retorna detalhes de um cartão específico.",
 )
-async def get_credit_card(
+def get_credit_card(
     card_id: UUID,
     current_user: CurrentUser,
     db: DatabaseSession,
 ):
     """Retorna os detalhes de um cartão específico."""
     service = CreditCardService(db)
-    card = service.get_by_id(card_id, current_user.id)
+    card, usage = service.get_with_usage(card_id, current_user.id)
     
-    response = CreditCardResponse.model_validate(card)
-    response.current_invoice = service.get_current_invoice(card.id, current_user.id)
-    response.available_limit = card.limit - (response.current_invoice or 0)
+    return _card_response(card, usage)
+
+
+@credit_cards_router.get(
+    "/{card_id}/invoices",
+    response_model=CreditCardInvoiceListResponse,
+    summary="Faturas do cartão",
+    description="Lista as faturas por ciclo (fechadas, aberta e futuras).",
+)
+def list_credit_card_invoices(
+    card_id: UUID,
+    current_user: CurrentUser,
+    db: DatabaseSession,
+    months_back: int = Query(6, ge=0, le=24, description="Faturas anteriores à aberta"),
+    months_ahead: int = Query(2, ge=1, le=24, description="Faturas posteriores à aberta"),
+):
+    """
+    Retorna as faturas do cartão, da mais antiga para a mais nova.
     
-    return response
+    Os ciclos seguem o dia de fechamento do cartão: compras feitas no dia do
+    fechamento já entram na fatura seguinte. `current` é a fatura aberta e
+    `next` a do ciclo seguinte (ex: parcelas já lançadas).
+    """
+    service = CreditCardService(db)
+    result = service.get_invoices(card_id, current_user.id, months_back, months_ahead)
+    return CreditCardInvoiceListResponse(**result)
 
 
 @credit_cards_router.put(
@@ -233,7 +260,7 @@ async def get_credit_card(
     summary="Atualizar cartão",
     description="Atualiza um cartão existente.",
 )
-async def update_credit_card(
+def update_credit_card(
     card_id: UUID,
     data: CreditCardUpdate,
     current_user: CurrentUser,
@@ -252,7 +279,7 @@ async def update_credit_card(
     summary="Excluir cartão",
     description="Remove um cartão do sistema.",
 )
-async def delete_credit_card(
+def delete_credit_card(
     card_id: UUID,
     current_user: CurrentUser,
     db: DatabaseSession,
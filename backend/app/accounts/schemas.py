@@ -2,13 +2,14 @@
 Schemas Pydantic para Contas e Cartões de Crédito.
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional, List
 from uuid import UUID
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
 from app.accounts.models import AccountType
+from app.accounts.invoices import InvoiceStatus
 
 
 # ===========================================
@@ -130,8 +131,10 @@ class CreditCardResponse(BaseModel):
     updated_at: datetime
     
     # Campos calculados (preenchidos pelo service)
-    current_invoice: Optional[Decimal] = None
-    available_limit: Optional[Decimal] = None
+    current_invoice: Optional[Decimal] = None  # Fatura aberta (ciclo atual)
+    next_invoice: Optional[Decimal] = None     # Lançamentos já no ciclo seguinte
+    available_limit: Optional[Decimal] = None  # Limite - despesas pendentes
+    utilization: Optional[Decimal] = None      # % do limite comprometido
 
 
 class CreditCardSummary(BaseModel):
@@ -155,3 +158,26 @@ class CreditCardListResponse(BaseModel):
     cards: List[CreditCardResponse]
     total: int
     total_limit: Decimal
+
+
+class CreditCardInvoice(BaseModel):
+    """Fatura de um ciclo do cartão."""
+    
+    reference_month: date = Field(..., description="Mês da fatura (dia 1)")
+    period_start: date = Field(..., description="Primeiro dia de compras do ciclo")
+    period_end: date = Field(..., description="Último dia de compras do ciclo")
+    closing_date: date
+    due_date: date
+    status: InvoiceStatus
+    total: Decimal = Field(..., description="Despesas menos estornos do ciclo")
+    pending: Decimal = Field(..., description="Despesas ainda pendentes")
+    transaction_count: int
+
+
+class CreditCardInvoiceListResponse(BaseModel):
+    """Schema de resposta para faturas de um cartão."""
+    
+    card_id: UUID
+    invoices: List[CreditCardInvoice]
+    current: CreditCardInvoice
+    next: CreditCardInvoice
@@ -2,13 +2,17 @@
 Service de Contas e Cartões - Regras de negócio.
 """
 
-from typing import List, Optional
+from datetime import date
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 from decimal import Decimal
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
+from app.core.cache import invalidate_user
+from app.core.dates import shift_month
 from app.accounts.models import Account, CreditCard
+from app.accounts.invoices import billing_cycle, invoice_month
 from app.accounts.repository import AccountRepository, CreditCardRepository
 from app.accounts.schemas import (
     AccountCreate,
@@ -41,7 +45,9 @@ class AccountService:
             color=data.color,
         )
         
-        return self.repository.create(account)
+        account = self.repository.create(account)
+        invalidate_user(user_id)
+        return account
     
     def get_by_id(self, account_id: UUID, user_id: UUID) -> Account:
         """Busca conta por ID."""
@@ -63,6 +69,10 @@ class AccountService:
         """Retorna saldo total de todas as contas."""
         return self.repository.get_total_balance(user_id)
     
+    def get_balance_summary(self, user_id: UUID) -> dict:
+        """Retorna saldo total e quantidade de contas ativas."""
+        return self.repository.get_balance_summary(user_id)
+    
     def update(self, account_id: UUID, user_id: UUID, data: AccountUpdate) -> Account:
         """Atualiza conta existente."""
         account = self.get_by_id(account_id, user_id)
@@ -78,18 +88,69 @@ class AccountService:
         if data.is_active is not None:
             account.is_active = data.is_active
         
-        return self.repository.update(account)
+        account = self.repository.update(account)
+        invalidate_user(user_id)
+        return account
     
     def delete(self, account_id: UUID, user_id: UUID) -> None:
         """Remove conta."""
         account = self.get_by_id(account_id, user_id)
         self.repository.delete(account)
+        invalidate_user(user_id)
+    
+    @staticmethod
+    def balance_effect(transaction) -> Optional[Tuple[UUID, Decimal]]:
+        """
+        Retorna `(conta, valor com sinal)` com que a transação afeta o saldo.
+        
+        Receitas somam, despesas subtraem; transações canceladas ou de
+        cartão não afetam saldo de conta (retorna None).
+        """
+        # Import aqui para evitar circular import
+        from app.transactions.models import TransactionType, TransactionStatus
+        
+        if not transaction.account_id or transaction.status == TransactionStatus.CANCELLED:
+            return None
+        
+        amount = Decimal(transaction.amount)
+        if transaction.type == TransactionType.EXPENSE:
+            amount = -amount
+        
+        return transaction.account_id, amount
+    
+    def apply_balance_change(
+        self,
+        old: Optional[Tuple[UUID, Decimal]],
+        new: Optional[Tuple[UUID, Decimal]],
+    ) -> None:
+        """
+        Ajusta saldos pela troca do efeito `old` pelo `new` (ver `balance_effect`).
+        
+        Cobre mudanças de valor, tipo, status e conta com um UPDATE incremental
+        por conta afetada. Não faz commit.
+        """
+        deltas = {}
+        if old:
+            deltas[old[0]] = deltas.get(old[0], Decimal("0.00")) - old[1]
+        if new:
+            deltas[new[0]] = deltas.get(new[0], Decimal("0.00")) + new[1]
+        
+        self.apply_balance_deltas(deltas)
+    
+    def apply_balance_deltas(self, deltas: Dict[UUID, Decimal]) -> None:
+        """Soma cada diferença ao saldo da conta, um UPDATE por conta. Não faz commit."""
+        for account_id, delta in deltas.items():
+            if delta:
+                self.repository.adjust_balance(account_id, delta)
     
     def recalculate_balance(self, account_id: UUID) -> Decimal:
         """
         Recalcula o saldo da conta baseado nas transações.
         
         Saldo = Saldo inicial + Receitas - Despesas
+        
+        Varre todas as transações da conta; o fluxo normal usa
+        `apply_balance_change`. Use para reparo/verificação offline.
         """
         # Import aqui para evitar circular import
         from app.transactions.repository import TransactionRepository
@@ -103,6 +164,7 @@ class AccountService:
         
         new_balance = account.initial_balance + balance
         self.repository.update_balance(account_id, new_balance)
+        invalidate_user(account.user_id)
         
         return new_balance
 
@@ -126,7 +188,9 @@ class CreditCardService:
             color=data.color,
         )
         
-        return self.repository.create(card)
+        card = self.repository.create(card)
+        invalidate_user(user_id)
+        return card
     
     def get_by_id(self, card_id: UUID, user_id: UUID) -> CreditCard:
         """Busca cartão por ID."""
@@ -167,21 +231,110 @@ class CreditCardService:
         if data.is_active is not None:
             card.is_active = data.is_active
         
-        return self.repository.update(card)
+        card = self.repository.update(card)
+        invalidate_user(user_id)
+        return card
     
     def delete(self, card_id: UUID, user_id: UUID) -> None:
         """Remove cartão."""
         card = self.get_by_id(card_id, user_id)
         self.repository.delete(card)
+        invalidate_user(user_id)
     
-    def get_current_invoice(self, card_id: UUID, user_id: UUID) -> Decimal:
+    def get_all_with_usage(
+        self,
+        user_id: UUID,
+        include_inactive: bool = False,
+        card_id: Optional[UUID] = None,
+        today: Optional[date] = None,
+    ) -> List[Tuple[CreditCard, dict]]:
         """
-        Calcula valor da fatura atual do cartão.
+        Lista cartões com fatura atual/seguinte, limite disponível e utilização.
         
-        Considera transações desde o último fechamento até hoje.
+        Uma única consulta para todos os cartões (ver
+        `CreditCardRepository.get_all_with_usage`).
+        """
+        rows = self.repository.get_all_with_usage(
+            user_id, today or date.today(), include_inactive, card_id
+        )
+        
+        cents = Decimal("0.01")
+        result = []
+        for card, usage in rows:
+            usage = {key: Decimal(value).quantize(cents) for key, value in usage.items()}
+            usage["available_limit"] = card.limit - usage["outstanding"]
+            usage["utilization"] = (
+                (usage["outstanding"] / card.limit * 100).quantize(Decimal("0.01"))
+                if card.limit > 0 else Decimal("0.00")
+            )
+            result.append((card, usage))
+        return result
+    
+    def get_with_usage(self, card_id: UUID, user_id: UUID) -> Tuple[CreditCard, dict]:
+        """Busca cartão por ID com faturas e uso do limite (ver `get_all_with_usage`)."""
+        rows = self.get_all_with_usage(user_id, include_inactive=True, card_id=card_id)
+        
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cartão não encontrado"
+            )
+        
+        return rows[0]
+    
+    def get_invoices(
+        self,
+        card_id: UUID,
+        user_id: UUID,
+        months_back: int = 6,
+        months_ahead: int = 2,
+        today: Optional[date] = None,
+    ) -> dict:
+        """
+        Lista as faturas do cartão por ciclo (fechadas, aberta e futuras).
+        
+        Todos os ciclos da janela são retornados, mesmo sem lançamentos; os
+        totais vêm de uma única consulta agrupada por ciclo.
+        
+        Args:
+            card_id: Cartão
+            user_id: Dono do cartão
+            months_back: Faturas anteriores à aberta
+            months_ahead: Faturas posteriores à aberta (mínimo 1)
         """
         # Import aqui para evitar circular import
         from app.transactions.repository import TransactionRepository
         
-        tx_repo = TransactionRepository(self.db)
-        return tx_repo.calculate_card_invoice(card_id)
+        card = self.get_by_id(card_id, user_id)
+        today = today or date.today()
+        months_ahead = max(months_ahead, 1)
+        current = invoice_month(today, card.closing_day)
+        months = [shift_month(current, delta) for delta in range(-months_back, months_ahead + 1)]
+        
+        totals = TransactionRepository(self.db).get_card_invoice_totals(
+            user_id, months[0], months[-1], card_ids=[card.id]
+        )
+        by_month = {row["reference_month"]: row for row in totals}
+        
+        invoices = []
+        for month in months:
+            cycle = billing_cycle(month, card.closing_day, card.due_day)
+            row = by_month.get(month, {})
+            invoices.append({
+                "reference_month": cycle.reference_month,
+                "period_start": cycle.period_start,
+                "period_end": cycle.period_end,
+                "closing_date": cycle.closing_date,
+                "due_date": cycle.due_date,
+                "status": cycle.status(today),
+                "total": row.get("total", Decimal("0.00")),
+                "pending": row.get("pending", Decimal("0.00")),
+                "transaction_count": row.get("count", 0),
+            })
+        
+        return {
+            "card_id": card.id,
+            "invoices": invoices,
+            "current": invoices[months_back],
+            "next": invoices[months_back + 1],
+        }
@@ -3,19 +3,14 @@ Core module - Configurações e utilitários centrais.
 """
 
 from app.core.config import settings
-from app.core.database import Base, get_db, engine, SessionLocal
+from app.core.database import Base, get_db, engine, SessionLocal, pool_metrics
 from app.core.security import (
     verify_password,
+    verify_and_update_password,
     get_password_hash,
     create_access_token,
     decode_access_token,
 )
-from app.core.dependencies import (
-    get_current_user,
-    get_current_active_user,
-    CurrentUser,
-    DatabaseSession,
-)
 
 __all__ = [
     "settings",
@@ -23,12 +18,10 @@ __all__ = [
     "get_db",
     "engine",
     "SessionLocal",
+    "pool_metrics",
     "verify_password",
+    "verify_and_update_password",
     "get_password_hash",
     "create_access_token",
     "decode_access_token",
-    "get_current_user",
-    "get_current_active_user",
-    "CurrentUser",
-    "DatabaseSession",
 ]
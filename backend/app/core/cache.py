@@ -0,0 +1,310 @@
+"""
+Cache de leituras por usuário (dashboard, indicadores, resumos) e dos
+usuários autenticados (`IdentityCache`).
+
+As chaves são `(user_id, endpoint, params)` e incluem a versão atual dos
+dados do usuário. Toda escrita que altera esses dados chama
+`invalidate_user`, que incrementa a versão: as entradas antigas deixam de ser
+encontradas e expiram sozinhas (TTL/LRU), sem varrer o cache.
+
+Backends:
+- `MemoryCache`: LRU com TTL em memória do processo (padrão).
+- `RedisCache`: qualquer cliente compatível com Redis (`get`, `set`, `incr`),
+  usado quando `CACHE_URL` aponta para um Redis; compartilha o cache entre
+  workers. Em testes, um stub com a mesma interface pode substituí-lo.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Optional
+from uuid import UUID, uuid4
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+
+class MemoryCache:
+    """LRU com TTL, seguro para uso entre threads."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()
+        self._counters = {}  # Fora do LRU: perder uma versão reativaria entradas antigas
+        self._markers = OrderedDict()  # Também fora do LRU, por ordem de expiração
+        self._lock = threading.Lock()
+        # As versões recomeçam do zero a cada processo; o epoch diferencia os ETags
+        self.epoch = uuid4().hex
+        self.shared = False  # Cada worker tem suas versões
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = self.ttl_seconds if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def mark(self, key: str, ttl: int) -> None:
+        """Marca `key` por `ttl` segundos; a marca não é despejada pelo LRU."""
+        now = time.monotonic()
+        with self._lock:
+            self._markers[key] = now + ttl
+            self._markers.move_to_end(key)
+            # Mesmo TTL para todas as marcas: as vencidas ficam no início
+            while self._markers and next(iter(self._markers.values())) < now:
+                self._markers.popitem(last=False)
+
+    def is_marked(self, key: str) -> bool:
+        with self._lock:
+            expires_at = self._markers.get(key)
+            return expires_at is not None and expires_at >= time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+            self._markers.clear()
+            self.epoch = uuid4().hex
+
+
+class RedisCache:
+    """Adapta um cliente Redis (ou stub compatível) à interface do cache."""
+
+    def __init__(self, client, ttl_seconds: int = 60, prefix: str = "fp:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.epoch = ""  # Versões persistem no Redis
+        self.shared = True  # Versões comuns a todos os workers
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = self.ttl_seconds if ttl is None else ttl
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl or None)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def mark(self, key: str, ttl: int) -> None:
+        self.client.set(self.prefix + key, 1, ex=ttl)
+
+    def is_marked(self, key: str) -> bool:
+        return self.client.get(self.prefix + key) is not None
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+class UserCache:
+    """Cache de respostas por usuário, invalidado por versão."""
+
+    def __init__(self, backend, enabled: bool = True, sticky_seconds: int = 0):
+        self.backend = backend
+        self.enabled = enabled
+        self.sticky_seconds = sticky_seconds
+
+    def get_or_set(self, user_id: UUID, endpoint: str, params: dict, compute: Callable[[], Any]) -> Any:
+        """
+        Retorna a resposta em cache ou calcula, guarda e retorna.
+
+        O valor é guardado já convertido para JSON (`jsonable_encoder`), então
+        o router o devolve pelo `response_model` como faria com o original.
+        Com o cache em memória e vários workers, cada processo tem sua cópia:
+        uma escrita só invalida o worker que a recebeu (use `CACHE_URL`).
+        """
+        if not self.enabled:
+            return compute()
+
+        key = self._key(user_id, endpoint, params)
+        cached = self.backend.get(key)
+        if cached is not None:
+            return cached
+
+        value = _encode(compute())
+        self.backend.set(key, value)
+        return value
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """Invalida todas as entradas do usuário (incrementa a versão)."""
+        self.backend.incr(self._version_key(user_id))
+        if self.sticky_seconds:
+            self.backend.mark(self._written_key(user_id), self.sticky_seconds)
+
+    def recently_written(self, user_id: UUID) -> bool:
+        """
+        Se o usuário escreveu nos últimos `sticky_seconds` (leitura vai ao primário).
+
+        A marca fica fora do LRU das respostas: despejada por outras entradas,
+        a leitura seguinte iria à réplica ainda atrasada.
+        """
+        return bool(self.sticky_seconds) and self.backend.is_marked(self._written_key(user_id))
+
+    def version(self, user_id: UUID) -> int:
+        """Versão atual dos dados do usuário (0 se nunca houve escrita)."""
+        return int(self.backend.get(self._version_key(user_id)) or 0)
+
+    def etag(self, user_id: UUID, resource: str) -> str:
+        """
+        ETag forte de um recurso do usuário (caminho + query).
+
+        Muda a cada escrita do usuário (versão) e a cada dia, já que faturas e
+        comparações mensais dependem da data atual. Independe de `enabled`: a
+        versão é incrementada mesmo com o cache de respostas desligado.
+        
+        Com o cache em memória a versão é por processo: uma escrita recebida
+        por outro worker não muda a tag deste. Por isso a tag também muda a
+        cada janela de `ttl_seconds`, e uma resposta desatualizada dura no
+        máximo o mesmo que no cache de respostas.
+        """
+        raw = f"{self.backend.epoch}:{user_id}:v{self.version(user_id)}:{date.today()}:{resource}"
+        if not self.backend.shared:
+            raw += f":t{int(time.time() // max(self.backend.ttl_seconds, 1))}"
+        return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+    def _key(self, user_id: UUID, endpoint: str, params: dict) -> str:
+        encoded = json.dumps(jsonable_encoder(params), sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha1(encoded.encode()).hexdigest()
+        return f"u:{user_id}:v{self.version(user_id)}:{endpoint}:{digest}"
+
+    @staticmethod
+    def _version_key(user_id: UUID) -> str:
+        return f"u:{user_id}:version"
+
+    @staticmethod
+    def _written_key(user_id: UUID) -> str:
+        return f"u:{user_id}:written"
+
+
+class IdentityCache:
+    """
+    Cache curto dos usuários autenticados, por `(user_id, iat do token)`.
+
+    Guarda só os campos públicos do usuário (sem o hash da senha) e evita o
+    SELECT de `users` a cada requisição. Invalidado por versão, como o
+    `UserCache`, em desativação, edição de perfil e troca de senha.
+    """
+
+    def __init__(self, backend, ttl_seconds: int = 30, enabled: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and ttl_seconds > 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Any, issued_at: Optional[int]) -> Optional[dict]:
+        """Retorna os dados do usuário em cache, ou None."""
+        if not self.enabled:
+            return None
+        data = self.backend.get(self._key(user_id, issued_at))
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, user_id: Any, issued_at: Optional[int], data: dict) -> None:
+        if self.enabled:
+            self.backend.set(self._key(user_id, issued_at), jsonable_encoder(data), ttl=self.ttl_seconds)
+
+    def invalidate(self, user_id: Any) -> None:
+        """Descarta as entradas do usuário, de todos os tokens."""
+        self.backend.incr(self._version_key(user_id))
+
+    def stats(self) -> dict:
+        """Contadores de acertos/falhas deste processo."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def _key(self, user_id: Any, issued_at: Optional[int]) -> str:
+        version = int(self.backend.get(self._version_key(user_id)) or 0)
+        return f"id:{user_id}:v{version}:{issued_at or 0}"
+
+    @staticmethod
+    def _version_key(user_id: Any) -> str:
+        return f"id:{user_id}:version"
+
+
+def _encode(value: Any) -> Any:
+    """
+    Converte a resposta para JSON, com Decimal como texto (não float) para
+    não perder centavos.
+
+    Schemas pydantic são serializados pelo próprio pydantic (`mode="json"`,
+    mesmo resultado do `jsonable_encoder`), bem mais rápido em respostas com
+    séries longas.
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, list) and value and all(isinstance(item, BaseModel) for item in value):
+        return [item.model_dump(mode="json") for item in value]
+    return jsonable_encoder(value, custom_encoder={Decimal: str})
+
+
+def _create_backend():
+    if settings.cache_url:
+        import redis  # Dependência opcional, só com CACHE_URL
+
+        return RedisCache(redis.Redis.from_url(settings.cache_url), ttl_seconds=settings.cache_ttl_seconds)
+    return MemoryCache(max_entries=settings.cache_max_entries, ttl_seconds=settings.cache_ttl_seconds)
+
+
+# Instâncias globais usadas pelos routers, services e dependencies
+user_cache = UserCache(
+    _create_backend(),
+    enabled=settings.cache_enabled,
+    sticky_seconds=settings.read_after_write_seconds if settings.database_read_url else 0,
+)
+identity_cache = IdentityCache(
+    user_cache.backend,
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+    enabled=settings.cache_enabled,
+)
+
+
+def invalidate_user(user_id: UUID) -> None:
+    """Invalida o cache de leituras do usuário após uma escrita."""
+    user_cache.invalidate_user(user_id)
+
+
+def invalidate_identity(user_id: UUID) -> None:
+    """Invalida o usuário autenticado em cache após alterar seus dados."""
+    identity_cache.invalidate(user_id)
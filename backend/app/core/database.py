@@ -3,21 +3,110 @@ Configuração do banco de dados PostgreSQL.
 Define engine, sessão e base para models.
 """
 
-from typing import Generator
-from sqlalchemy import create_engine
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Generator, Iterator
+from sqlalchemy import create_engine, exc
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
 
 
+class PoolMetrics:
+    """Contadores do pool de conexões deste processo."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+    
+    def record_checkout(self, wait: float, overflowed: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            if overflowed:
+                self.overflow_events += 1
+    
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+    
+    def snapshot(self, pool: QueuePool) -> dict:
+        """
+        Estado atual do pool e contadores acumulados.
+        
+        `overflow_events` conta conexões abertas além de `pool_size`; se cresce
+        com frequência (ou há `timeouts`), o pool está pequeno para a carga.
+        """
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "checkouts": self.checkouts,
+                "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+            }
+
+
+pool_metrics = PoolMetrics()
+read_pool_metrics = PoolMetrics()
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool que mede a espera por conexão e as aberturas em overflow."""
+    
+    metrics = pool_metrics
+    
+    def _do_get(self):
+        overflow_before = self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        overflowed = self.overflow() > max(overflow_before, 0)
+        self.metrics.record_checkout(time.perf_counter() - start, overflowed)
+        return connection
+
+
+class ReadQueuePool(MeteredQueuePool):
+    """Pool da réplica de leitura, com contadores próprios."""
+    
+    metrics = read_pool_metrics
+
+
+def _create_engine(url: str, poolclass):
+    return create_engine(
+        url,
+        poolclass=poolclass,
+        pool_pre_ping=settings.db_pool_pre_ping,  # Verifica conexão antes de usar
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        echo=settings.debug,  # Log SQL em debug mode
+    )
+
+
 # Engine do SQLAlchemy
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,  # Verifica conexão antes de usar
-    pool_size=10,
-    max_overflow=20,
-    echo=settings.debug,  # Log SQL em debug mode
-)
+engine = _create_engine(settings.database_url, MeteredQueuePool)
+
+# Engine da réplica de leitura (None sem DATABASE_READ_URL)
+read_engine = _create_engine(settings.database_read_url, ReadQueuePool) if settings.database_read_url else None
 
 # Fábrica de sessões
 SessionLocal = sessionmaker(
@@ -26,10 +115,27 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# Fábrica de sessões da réplica (consultas de relatório)
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine or engine,
+)
+
 # Base para os models
 Base = declarative_base()
 
 
+def enum_values(enum_class) -> list:
+    """
+    Rótulos de um Enum no banco: os valores dos membros ("paid"), como criados
+    pelas migrations, e não os nomes ("PAID"), que são o padrão do SQLAlchemy.
+
+    Uso: `Column(Enum(TransactionStatus, values_callable=enum_values))`
+    """
+    return [member.value for member in enum_class]
+
+
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency que fornece uma sessão do banco de dados.
@@ -40,3 +146,24 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """
+    Agrupa as escritas de uma chamada da API em um único flush e commit.
+    
+    Os objetos não são expirados no commit: os valores gerados (id, datas,
+    defaults) já são preenchidos no cliente, então a resposta é montada sem
+    refresh nem SELECT extra. Em caso de erro, tudo é desfeito.
+    """
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.expire_on_commit = expire_on_commit
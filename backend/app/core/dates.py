@@ -0,0 +1,11 @@
+"""
+Utilitários de datas.
+"""
+
+from datetime import date
+
+
+def shift_month(month_start: date, delta: int) -> date:
+    """Soma `delta` meses a uma data de início de mês."""
+    index = month_start.year * 12 + month_start.month - 1 + delta
+    return date(index // 12, index % 12 + 1, 1)
@@ -3,12 +3,16 @@ Dependencies para injeção em rotas FastAPI.
 Inclui autenticação e acesso ao banco de dados.
 """
 
-from typing import Annotated
-from fastapi import Depends, HTTPException, status
+from datetime import datetime
+from typing import Annotated, Generator, Optional
+from urllib.parse import urlencode
+from uuid import UUID
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from app.core.database import get_db
+from app.core.cache import identity_cache, user_cache
+from app.core.database import ReadSessionLocal, get_db, read_engine
 from app.core.security import decode_access_token
 from app.users.models import User
 from app.users.repository import UserRepository
@@ -18,7 +22,7 @@ from app.users.repository import UserRepository
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-async def get_current_user(
+def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: Annotated[Session, Depends(get_db)],
 ) -> User:
@@ -27,6 +31,8 @@ async def get_current_user(
     
     Extrai o token do header Authorization, decodifica e busca o usuário.
     Lança exceção 401 se token inválido ou usuário não encontrado.
+    
+    O usuário vem do `identity_cache` quando possível, sem ir ao banco.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,9 +45,15 @@ async def get_current_user(
     if token_data is None or token_data.user_id is None:
         raise credentials_exception
     
-    # Busca o usuário
-    user_repo = UserRepository(db)
-    user = user_repo.get_by_id(token_data.user_id)
+    # Busca o usuário (cache curto por id + iat antes do banco)
+    cached = identity_cache.get(token_data.user_id, token_data.issued_at)
+    if cached is not None:
+        user = _user_from_cache(db, cached)
+    else:
+        user_repo = UserRepository(db)
+        user = user_repo.get_by_id(token_data.user_id)
+        if user is not None:
+            identity_cache.set(token_data.user_id, token_data.issued_at, _user_to_cache(user))
     
     if user is None:
         raise credentials_exception
@@ -55,6 +67,39 @@ async def get_current_user(
     return user
 
 
+# Campos guardados no cache de identidade; o hash da senha fica de fora
+_CACHED_USER_FIELDS = ("id", "email", "name", "avatar_url", "is_active", "created_at", "updated_at")
+
+
+def _user_to_cache(user: User) -> dict:
+    return {field: getattr(user, field) for field in _CACHED_USER_FIELDS}
+
+
+def _user_from_cache(db: Session, data: dict) -> User:
+    """
+    Remonta o `User` do cache já associado à sessão, sem SELECT.
+    
+    Campos fora do cache (ex: `password_hash`) ficam expirados e são
+    carregados do banco só se acessados, como na troca de senha.
+    """
+    user = User(
+        id=UUID(str(data["id"])),
+        email=data["email"],
+        name=data["name"],
+        avatar_url=data["avatar_url"],
+        is_active=data["is_active"],
+        created_at=_as_datetime(data["created_at"]),
+        updated_at=_as_datetime(data["updated_at"]),
+    )
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def _as_datetime(value) -> datetime:
+    # O backend Redis guarda JSON: datas voltam como texto ISO
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
 async def get_current_active_user(
     current_user: Annotated[User, Depends(get_current_user)],
 ) -> User:
@@ -73,3 +118,73 @@ async def get_current_active_user(
 # Type aliases para facilitar uso nas rotas
 CurrentUser = Annotated[User, Depends(get_current_user)]
 DatabaseSession = Annotated[Session, Depends(get_db)]
+
+
+def get_read_db(
+    current_user: CurrentUser,
+    db: DatabaseSession,
+) -> Generator[Session, None, None]:
+    """
+    Dependency de sessão para consultas de relatório (só leitura).
+    
+    Usa a réplica (`DATABASE_READ_URL`) quando configurada. Para o usuário
+    ver as próprias escritas, quem escreveu nos últimos
+    `READ_AFTER_WRITE_SECONDS` continua no primário, reaproveitando a sessão
+    da requisição. Com vários workers, a marca de escrita só é compartilhada
+    com `CACHE_URL`.
+    """
+    if read_engine is None or user_cache.recently_written(current_user.id):
+        yield db
+        return
+    
+    read_db = ReadSessionLocal()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
+ReadSession = Annotated[Session, Depends(get_read_db)]
+
+
+def check_etag(
+    request: Request,
+    response: Response,
+    current_user: CurrentUser,
+) -> None:
+    """
+    Dependency de ETag / If-None-Match para as leituras (GET) de um router.
+    
+    A tag vem da versão dos dados do usuário, incrementada a cada escrita
+    (ver `app.core.cache`), mais o caminho e a query da requisição. Se o
+    cliente já tem a representação atual, responde 304 antes de o endpoint
+    rodar: nenhuma consulta de agregação é feita.
+    
+    Com o cache em memória e vários workers, a versão é por processo; a tag
+    também expira a cada CACHE_TTL_SECONDS para que uma escrita feita em
+    outro worker apareça (use `CACHE_URL` para 304 até a próxima escrita).
+    """
+    if request.method != "GET":
+        return
+    
+    query = urlencode(sorted(request.query_params.multi_items()))
+    tag = user_cache.etag(current_user.id, f"{request.url.path}?{query}")
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    
+    if _etag_matches(request.headers.get("if-none-match"), tag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+
+
+def _etag_matches(if_none_match: Optional[str], tag: str) -> bool:
+    """Compara If-None-Match com a tag (comparação fraca, como pede o RFC 9110)."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or tag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+# Aplicada nos routers de leitura, APIRouter(..., dependencies=[ETagCheck]), ou
+# rota a rota quando o router tem respostas sem tag (ex: downloads em streaming)
+ETagCheck = Depends(check_etag)
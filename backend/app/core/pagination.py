@@ -0,0 +1,60 @@
+"""
+Utilitários de paginação por cursor (keyset).
+
+O cursor é opaco para o cliente: uma lista de valores da chave de ordenação
+serializada em JSON e codificada em base64 url-safe.
+"""
+
+import base64
+import json
+from typing import Any, List
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Codifica os valores da chave de ordenação em um cursor opaco.
+
+    Args:
+        values: Valores da última linha da página (ex: [date, created_at, id])
+
+    Returns:
+        Cursor em base64 url-safe, sem padding
+    """
+    raw = json.dumps([str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """
+    Decodifica um cursor gerado por `encode_cursor`.
+
+    Args:
+        cursor: Cursor recebido do cliente
+        size: Quantidade de valores esperada na chave
+
+    Returns:
+        Lista com os valores (em texto) da chave de ordenação
+
+    Raises:
+        HTTPException: Se o cursor for inválido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        values = None
+
+    # `encode_cursor` só gera textos; outros tipos quebrariam a conversão da chave
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(isinstance(value, str) for value in values)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido"
+        )
+
+    return values
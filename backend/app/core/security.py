@@ -2,8 +2,10 @@
 Funções de segurança: hashing de senhas e JWT.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from pydantic import BaseModel
@@ -11,24 +13,48 @@ from pydantic import BaseModel
 from app.core.config import settings
 
 
-# Contexto para hashing de senhas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Contexto para hashing de senhas. Hashes com custo diferente de
+# BCRYPT_ROUNDS são marcados para atualização (rehash no próximo login).
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+)
+
+# Pool dedicado ao bcrypt: limita quantos hashes rodam ao mesmo tempo (o
+# bcrypt libera o GIL, então usam núcleos em paralelo) e os demais logins
+# esperam na fila sem ocupar CPU das outras requisições.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers or os.cpu_count() or 1,
+    thread_name_prefix="bcrypt",
+)
 
 
 class TokenData(BaseModel):
     """Dados extraídos do token JWT."""
     user_id: str | None = None
     email: str | None = None
+    issued_at: int | None = None
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica se a senha em texto corresponde ao hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verifica se a senha em texto corresponde ao hash (no pool de hashing)."""
+    return _hash_pool.submit(pwd_context.verify, plain_password, hashed_password).result()
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha e, se o hash usa um custo antigo, gera o novo hash.
+    
+    Returns:
+        Tupla com (senha correta, novo hash ou None se não precisa atualizar)
+    """
+    return _hash_pool.submit(pwd_context.verify_and_update, plain_password, hashed_password).result()
 
 
 def get_password_hash(password: str) -> str:
-    """Gera hash bcrypt da senha."""
-    return pwd_context.hash(password)
+    """Gera hash bcrypt da senha (no pool de hashing)."""
+    return _hash_pool.submit(pwd_context.hash, password).result()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -43,15 +69,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         Token JWT codificado
     """
     to_encode = data.copy()
+    now = datetime.now(timezone.utc)
     
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(
+        expire = now + timedelta(
             minutes=settings.access_token_expire_minutes
         )
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": now})
     
     encoded_jwt = jwt.encode(
         to_encode,
@@ -80,11 +107,12 @@ def decode_access_token(token: str) -> Optional[TokenData]:
         )
         user_id: str = payload.get("sub")
         email: str = payload.get("email")
+        issued_at: Optional[int] = payload.get("iat")
         
         if user_id is None:
             return None
         
-        return TokenData(user_id=user_id, email=email)
+        return TokenData(user_id=user_id, email=email, issued_at=issued_at)
     
     except JWTError:
         return None
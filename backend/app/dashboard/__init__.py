@@ -11,7 +11,9 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, Query
 
-from app.core.dependencies import CurrentUser, DatabaseSession
+from app.core.cache import user_cache
+from app.core.dates import shift_month
+from app.core.dependencies import CurrentUser, ReadSession, ETagCheck
 from app.transactions.repository import TransactionRepository
 from app.transactions.models import TransactionType
 from app.accounts.service import AccountService
@@ -83,32 +85,8 @@ class DashboardService:
     ) -> DashboardSummary:
         """Calcula resumo do período."""
         tx_repo = TransactionRepository(self.db)
-        account_service = AccountService(self.db)
-        
-        # Totais de transações
-        totals = tx_repo.get_totals_by_type(user_id, start_date, end_date)
-        income = totals["income"]
-        expense = totals["expense"]
-        
-        # Saldo total das contas
-        total_balance = account_service.get_total_balance(user_id)
-        
-        # Quantidade de contas e transações
-        accounts = account_service.get_all(user_id)
-        tx_count = tx_repo.count_by_user(user_id, start_date, end_date)
-        
-        # % Renda comprometida
-        committed_pct = (expense / income * 100) if income > 0 else Decimal("0")
-        
-        return DashboardSummary(
-            total_balance=total_balance,
-            total_income=income,
-            total_expense=expense,
-            balance=income - expense,
-            income_committed_pct=committed_pct.quantize(Decimal("0.01")),
-            account_count=len(accounts),
-            transaction_count=tx_count,
-        )
+        aggregates = tx_repo.get_period_aggregates(user_id, start_date, end_date)
+        return self._build_summary(user_id, aggregates)
     
     def get_expenses_by_category(
         self, 
@@ -119,19 +97,7 @@ class DashboardService:
         """Retorna distribuição de despesas por categoria."""
         tx_repo = TransactionRepository(self.db)
         data = tx_repo.get_totals_by_category(user_id, TransactionType.EXPENSE, start_date, end_date)
-        
-        total = sum(item["total"] for item in data)
-        
-        return [
-            CategoryBreakdown(
-                category_id=item["category_id"],
-                category_name=item["category_name"],
-                category_color=item["category_color"],
-                total=item["total"],
-                percentage=(item["total"] / total * 100).quantize(Decimal("0.01")) if total > 0 else Decimal("0"),
-            )
-            for item in data
-        ]
+        return self._build_breakdown(data)
     
     def get_income_by_category(
         self, 
@@ -142,19 +108,7 @@ class DashboardService:
         """Retorna distribuição de receitas por categoria."""
         tx_repo = TransactionRepository(self.db)
         data = tx_repo.get_totals_by_category(user_id, TransactionType.INCOME, start_date, end_date)
-        
-        total = sum(item["total"] for item in data)
-        
-        return [
-            CategoryBreakdown(
-                category_id=item["category_id"],
-                category_name=item["category_name"],
-                category_color=item["category_color"],
-                total=item["total"],
-                percentage=(item["total"] / total * 100).quantize(Decimal("0.01")) if total > 0 else Decimal("0"),
-            )
-            for item in data
-        ]
+        return self._build_breakdown(data)
     
     def get_cash_flow(
         self, 
@@ -165,45 +119,35 @@ class DashboardService:
         """Retorna fluxo de caixa diário."""
         tx_repo = TransactionRepository(self.db)
         data = tx_repo.get_daily_flow(user_id, start_date, end_date)
-        
-        return [
-            DailyCashFlowItem(
-                date=item["date"],
-                income=item["income"],
-                expense=item["expense"],
-                balance=item["balance"],
-            )
-            for item in data
-        ]
+        return self._build_cash_flow(data)
     
     def get_monthly_comparison(
         self, 
         user_id: UUID, 
         months: int = 6
     ) -> List[MonthlyComparison]:
-        """Retorna comparação mensal dos últimos N meses."""
+        """
+        Retorna comparação mensal dos últimos N meses (incluindo o atual).
+        
+        Uma única consulta agrupada por mês cobre toda a janela; meses sem
+        transações aparecem zerados.
+        """
         tx_repo = TransactionRepository(self.db)
-        results = []
         
         today = date.today()
+        first_month = shift_month(today.replace(day=1), -(months - 1))
+        last_day = shift_month(today.replace(day=1), 1) - timedelta(days=1)
+        
+        totals = tx_repo.get_monthly_totals(user_id, first_month, last_day)
         
-        for i in range(months - 1, -1, -1):
-            # Calcular primeiro e último dia do mês
-            month_date = today.replace(day=1) - timedelta(days=i * 30)
-            month_start = month_date.replace(day=1)
-            
-            # Último dia do mês
-            if month_start.month == 12:
-                month_end = month_start.replace(year=month_start.year + 1, month=1, day=1) - timedelta(days=1)
-            else:
-                month_end = month_start.replace(month=month_start.month + 1, day=1) - timedelta(days=1)
-            
-            totals = tx_repo.get_totals_by_type(user_id, month_start, month_end)
-            
+        results = []
+        for i in range(months):
+            key = shift_month(first_month, i).strftime("%Y-%m")
+            month_totals = totals.get(key, {})
             results.append(MonthlyComparison(
-                month=month_start.strftime("%Y-%m"),
-                income=totals["income"],
-                expense=totals["expense"],
+                month=key,
+                income=month_totals.get("income", Decimal("0.00")),
+                expense=month_totals.get("expense", Decimal("0.00")),
             ))
         
         return results
@@ -214,89 +158,165 @@ class DashboardService:
         start_date: date, 
         end_date: date
     ) -> DashboardData:
-        """Retorna todos os dados do dashboard."""
+        """
+        Retorna todos os dados do dashboard.
+        
+        Resumo, categorias e fluxo diário saem de uma única varredura agrupada
+        das transações do período (ver `get_period_aggregates`).
+        """
+        tx_repo = TransactionRepository(self.db)
+        aggregates = tx_repo.get_period_aggregates(user_id, start_date, end_date)
+        
         return DashboardData(
-            summary=self.get_summary(user_id, start_date, end_date),
-            expenses_by_category=self.get_expenses_by_category(user_id, start_date, end_date),
-            income_by_category=self.get_income_by_category(user_id, start_date, end_date),
-            cash_flow=self.get_cash_flow(user_id, start_date, end_date),
+            summary=self._build_summary(user_id, aggregates),
+            expenses_by_category=self._build_breakdown(aggregates["by_category"]["expense"]),
+            income_by_category=self._build_breakdown(aggregates["by_category"]["income"]),
+            cash_flow=self._build_cash_flow(aggregates["daily_flow"]),
             monthly_comparison=self.get_monthly_comparison(user_id),
         )
+    
+    def _build_summary(self, user_id: UUID, aggregates: dict) -> DashboardSummary:
+        """Monta o resumo a partir das agregações do período."""
+        account_service = AccountService(self.db)
+        accounts = account_service.get_balance_summary(user_id)
+        
+        income = aggregates["totals"]["income"]
+        expense = aggregates["totals"]["expense"]
+        
+        # % Renda comprometida
+        committed_pct = (expense / income * 100) if income > 0 else Decimal("0")
+        
+        return DashboardSummary(
+            total_balance=accounts["total_balance"],
+            total_income=income,
+            total_expense=expense,
+            balance=income - expense,
+            income_committed_pct=committed_pct.quantize(Decimal("0.01")),
+            account_count=accounts["account_count"],
+            transaction_count=aggregates["transaction_count"],
+        )
+    
+    @staticmethod
+    def _build_breakdown(data: List[dict]) -> List[CategoryBreakdown]:
+        """Converte totais por categoria em distribuição percentual."""
+        total = sum(item["total"] for item in data)
+        
+        return [
+            CategoryBreakdown(
+                category_id=item["category_id"],
+                category_name=item["category_name"],
+                category_color=item["category_color"],
+                total=item["total"],
+                percentage=(item["total"] / total * 100).quantize(Decimal("0.01")) if total > 0 else Decimal("0"),
+            )
+            for item in data
+        ]
+    
+    @staticmethod
+    def _build_cash_flow(data: List[dict]) -> List[DailyCashFlowItem]:
+        """Converte o fluxo diário em itens de resposta."""
+        return [
+            DailyCashFlowItem(
+                date=item["date"],
+                income=item["income"],
+                expense=item["expense"],
+                balance=item["balance"],
+            )
+            for item in data
+        ]
 
 
 # ===========================================
 # Router
 # ===========================================
 
-dashboard_router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+dashboard_router = APIRouter(prefix="/dashboard", tags=["Dashboard"], dependencies=[ETagCheck])
 
 
 @dashboard_router.get("/summary", response_model=DashboardSummary)
-async def get_summary(
+def get_summary(
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: ReadSession,
     start_date: date = Query(...),
     end_date: date = Query(...),
 ):
     """Retorna resumo do período para os cards principais."""
     service = DashboardService(db)
-    return service.get_summary(current_user.id, start_date, end_date)
+    return user_cache.get_or_set(
+        current_user.id, "dashboard.summary", {"start_date": start_date, "end_date": end_date},
+        lambda: service.get_summary(current_user.id, start_date, end_date),
+    )
 
 
 @dashboard_router.get("/expenses-by-category", response_model=List[CategoryBreakdown])
-async def get_expenses_by_category(
+def get_expenses_by_category(
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: ReadSession,
     start_date: date = Query(...),
     end_date: date = Query(...),
 ):
     """Retorna distribuição de despesas por categoria."""
     service = DashboardService(db)
-    return service.get_expenses_by_category(current_user.id, start_date, end_date)
+    return user_cache.get_or_set(
+        current_user.id, "dashboard.expenses_by_category", {"start_date": start_date, "end_date": end_date},
+        lambda: service.get_expenses_by_category(current_user.id, start_date, end_date),
+    )
 
 
 @dashboard_router.get("/income-by-category", response_model=List[CategoryBreakdown])
-async def get_income_by_category(
+def get_income_by_category(
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: ReadSession,
     start_date: date = Query(...),
     end_date: date = Query(...),
 ):
     """Retorna distribuição de receitas por categoria."""
     service = DashboardService(db)
-    return service.get_income_by_category(current_user.id, start_date, end_date)
+    return user_cache.get_or_set(
+        current_user.id, "dashboard.income_by_category", {"start_date": start_date, "end_date": end_date},
+        lambda: service.get_income_by_category(current_user.id, start_date, end_date),
+    )
 
 
 @dashboard_router.get("/cash-flow", response_model=List[DailyCashFlowItem])
-async def get_cash_flow(
+def get_cash_flow(
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: ReadSession,
     start_date: date = Query(...),
     end_date: date = Query(...),
 ):
     """Retorna fluxo de caixa diário do período."""
     service = DashboardService(db)
-    return service.get_cash_flow(current_user.id, start_date, end_date)
+    return user_cache.get_or_set(
+        current_user.id, "dashboard.cash_flow", {"start_date": start_date, "end_date": end_date},
+        lambda: service.get_cash_flow(current_user.id, start_date, end_date),
+    )
 
 
 @dashboard_router.get("/monthly-comparison", response_model=List[MonthlyComparison])
-async def get_monthly_comparison(
+def get_monthly_comparison(
     current_user: CurrentUser,
-    db: DatabaseSession,
-    months: int = Query(6, ge=1, le=12),
+    db: ReadSession,
+    months: int = Query(6, ge=1, le=60),
 ):
     """Retorna comparação dos últimos N meses."""
     service = DashboardService(db)
-    return service.get_monthly_comparison(current_user.id, months)
+    return user_cache.get_or_set(
+        current_user.id, "dashboard.monthly_comparison", {"months": months},
+        lambda: service.get_monthly_comparison(current_user.id, months),
+    )
 
 
 @dashboard_router.get("", response_model=DashboardData)
-async def get_full_dashboard(
+def get_full_dashboard(
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: ReadSession,
     start_date: date = Query(...),
     end_date: date = Query(...),
 ):
     """Retorna todos os dados do dashboard em uma única chamada."""
     service = DashboardService(db)
-    return service.get_full_dashboard(current_user.id, start_date, end_date)
+    return user_cache.get_or_set(
+        current_user.id, "dashboard.full", {"start_date": start_date, "end_date": end_date},
+        lambda: service.get_full_dashboard(current_user.id, start_date, end_date),
+    )
@@ -15,8 +15,9 @@ from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, Query
 
-from app.core.database import Base
-from app.core.dependencies import CurrentUser, DatabaseSession
+from app.core.database import Base, enum_values
+from app.core.cache import user_cache
+from app.core.dependencies import CurrentUser, DatabaseSession, ReadSession
 
 
 # ===========================================
@@ -39,7 +40,7 @@ class Indicator(Base):
     name = Column(String(255), nullable=False)
     code = Column(String(100), nullable=False, unique=True)
     description = Column(String(500), nullable=True)
-    type = Column(Enum(IndicatorType), nullable=False)
+    type = Column(Enum(IndicatorType, values_callable=enum_values), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
 
@@ -163,7 +164,7 @@ indicators_router = APIRouter(prefix="/indicators", tags=["Indicadores"])
 
 
 @indicators_router.get("", response_model=List[IndicatorResponse])
-async def list_indicators(current_user: CurrentUser, db: DatabaseSession):
+def list_indicators(current_user: CurrentUser, db: DatabaseSession):
     """Lista indicadores disponíveis."""
     return [
         IndicatorResponse(
@@ -175,18 +176,20 @@ async def list_indicators(current_user: CurrentUser, db: DatabaseSession):
 
 
 @indicators_router.get("/values", response_model=IndicatorListResponse)
-async def get_indicator_values(
+def get_indicator_values(
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: ReadSession,
     start_date: date = Query(...),
     end_date: date = Query(...),
 ):
     """Calcula valores dos indicadores para o período."""
     service = IndicatorService(db)
-    indicators = service.calculate_indicators(current_user.id, start_date, end_date)
     
-    return IndicatorListResponse(
-        indicators=indicators,
-        period_start=start_date,
-        period_end=end_date,
+    return user_cache.get_or_set(
+        current_user.id, "indicators.values", {"start_date": start_date, "end_date": end_date},
+        lambda: IndicatorListResponse(
+            indicators=service.calculate_indicators(current_user.id, start_date, end_date),
+            period_start=start_date,
+            period_end=end_date,
+        ),
     )
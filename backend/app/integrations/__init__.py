@@ -2,21 +2,31 @@
 Integrations module - Integrações com bancos e WhatsApp.
 """
 
+import time
 import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
 from enum import Enum as PyEnum
-from typing import Optional, List
+from typing import BinaryIO, Optional, List
 from uuid import UUID
 
 from pydantic import BaseModel, Field, ConfigDict
 from sqlalchemy import Column, String, Boolean, DateTime, Numeric, Enum, ForeignKey, JSON
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Session, relationship
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile, status
 
-from app.core.database import Base
+from app.core.database import Base, enum_values
 from app.core.dependencies import CurrentUser, DatabaseSession
+from app.integrations.statements import (
+    CSV_PROVIDERS,
+    StatementError,
+    open_statement,
+    parse_statement,
+)
+from app.transactions.models import TransactionType, TransactionStatus, transaction_fingerprint
+from app.transactions.repository import TransactionRepository
+from app.transactions.service import TransactionService
 
 
 # ===========================================
@@ -37,7 +47,7 @@ class BankIntegration(Base):
     id = Column(PGUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     user_id = Column(PGUUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     provider = Column(String(100), nullable=False)
-    status = Column(Enum(IntegrationStatus), nullable=False, default=IntegrationStatus.DISCONNECTED)
+    status = Column(Enum(IntegrationStatus, values_callable=enum_values), nullable=False, default=IntegrationStatus.DISCONNECTED)
     connected_at = Column(DateTime(timezone=True), nullable=True)
     last_sync_at = Column(DateTime(timezone=True), nullable=True)
     config = Column(JSON, nullable=True)
@@ -87,6 +97,19 @@ class BankProvider(BaseModel):
     available: bool = True
 
 
+class StatementImportResponse(BaseModel):
+    provider: str
+    format: str
+    rows_read: int
+    imported: int
+    duplicates: int
+    ignored: int  # Ex: pagamentos/estornos em fatura de cartão
+    errors: int
+    error_samples: List[str] = []
+    elapsed_seconds: float
+    rows_per_second: float
+
+
 class WhatsAppSettingsResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
@@ -112,6 +135,9 @@ class WhatsAppSettingsUpdate(BaseModel):
 # Service
 # ===========================================
 
+IMPORT_CHUNK_SIZE = 1000  # Lançamentos por lote (e por commit) na importação de extratos
+
+
 class IntegrationService:
     """Gerencia integrações com serviços externos."""
     
@@ -196,6 +222,150 @@ class IntegrationService:
         self.db.commit()
         return integration
     
+    def import_statement(
+        self,
+        user_id: UUID,
+        provider: str,
+        raw: BinaryIO,
+        filename: Optional[str] = None,
+        account_id: Optional[UUID] = None,
+        credit_card_id: Optional[UUID] = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+    ) -> StatementImportResponse:
+        """
+        Importa um extrato OFX ou CSV para uma conta ou cartão.
+        
+        O arquivo é lido em streaming e gravado em lotes de `chunk_size`
+        (um commit por lote), então a memória usada não depende do tamanho
+        do extrato. Lançamentos já existentes (mesma impressão digital) são
+        ignorados.
+        """
+        valid_providers = [p["code"] for p in self.BANK_PROVIDERS]
+        if provider not in valid_providers:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provedor não suportado")
+        if bool(account_id) == bool(credit_card_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe uma conta OU um cartão de destino"
+            )
+        
+        tx_repo = TransactionRepository(self.db)
+        owned = tx_repo.get_owned_references(
+            user_id,
+            account_ids={account_id} if account_id else set(),
+            credit_card_ids={credit_card_id} if credit_card_id else set(),
+            category_ids=set(),
+        )
+        if account_id and account_id not in owned["accounts"]:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conta não encontrada")
+        if credit_card_id and credit_card_id not in owned["credit_cards"]:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cartão não encontrado")
+        
+        text, fmt = open_statement(raw, filename)
+        if fmt == "csv" and provider not in CSV_PROVIDERS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="CSV não suportado para este banco; envie o extrato em OFX"
+            )
+        
+        started = time.perf_counter()
+        started_at = datetime.now(timezone.utc)
+        result = {"rows_read": 0, "imported": 0, "duplicates": 0, "ignored": 0, "errors": 0}
+        error_samples = []
+        chunk = []
+        
+        for line in parse_statement(text, fmt, provider):
+            result["rows_read"] += 1
+            if isinstance(line, StatementError):
+                result["errors"] += 1
+                if len(error_samples) < 20:
+                    error_samples.append(f"Lançamento {result['rows_read']}: {line}")
+                continue
+            
+            row = self._statement_row(user_id, line, account_id, credit_card_id)
+            if row is None:
+                result["ignored"] += 1
+                continue
+            
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                self._import_chunk(tx_repo, chunk, started_at, result)
+                chunk = []
+        
+        self._import_chunk(tx_repo, chunk, started_at, result)
+        
+        self._touch_integration(user_id, provider)
+        
+        elapsed = time.perf_counter() - started
+        return StatementImportResponse(
+            provider=provider,
+            format=fmt,
+            error_samples=error_samples,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(result["rows_read"] / elapsed, 1) if elapsed else 0.0,
+            **result,
+        )
+    
+    @staticmethod
+    def _statement_row(user_id, line, account_id, credit_card_id) -> Optional[dict]:
+        """Converte o lançamento do extrato em linha de transação (None = ignorar)."""
+        if not line.amount:
+            return None
+        # Os parsers usam o mesmo sinal para conta e cartão (negativo = saída):
+        # na fatura, compras vêm negativas e créditos (pagamentos/estornos) positivos
+        if credit_card_id and line.amount > 0:
+            return None
+        
+        tx_type = TransactionType.EXPENSE if line.amount < 0 else TransactionType.INCOME
+        
+        description = line.description[:255]
+        amount = abs(line.amount)
+        return {
+            "user_id": user_id,
+            "account_id": account_id,
+            "credit_card_id": credit_card_id,
+            "type": tx_type,
+            "description": description,
+            "amount": amount,
+            "date": line.date,
+            "status": TransactionStatus.PAID,
+            "fingerprint": transaction_fingerprint(
+                account_id, credit_card_id, line.date, amount, description
+            ),
+        }
+    
+    def _import_chunk(
+        self,
+        tx_repo: TransactionRepository,
+        chunk: List[dict],
+        started_at: datetime,
+        result: dict,
+    ) -> None:
+        """Descarta os lançamentos já existentes e grava o restante do lote."""
+        if not chunk:
+            return
+        
+        new = tx_repo.find_new_fingerprints(
+            chunk[0]["user_id"],
+            {row["fingerprint"] for row in chunk},
+            created_before=started_at,
+        )
+        rows = [row for row in chunk if row["fingerprint"] in new]
+        
+        result["duplicates"] += len(chunk) - len(rows)
+        result["imported"] += TransactionService(self.db).insert_many(rows)
+    
+    def _touch_integration(self, user_id: UUID, provider: str) -> None:
+        """Registra a importação como sincronização, se o banco estiver conectado."""
+        integration = self.db.query(BankIntegration).filter(
+            BankIntegration.user_id == user_id,
+            BankIntegration.provider == provider
+        ).first()
+        
+        if integration:
+            integration.last_sync_at = datetime.now(timezone.utc)
+            self.db.commit()
+    
     def get_whatsapp_settings(self, user_id: UUID) -> Optional[WhatsAppSettings]:
         """Retorna configurações de WhatsApp do usuário."""
         return self.db.query(WhatsAppSettings).filter(WhatsAppSettings.user_id == user_id).first()
@@ -234,14 +404,14 @@ integrations_router = APIRouter(prefix="/integrations", tags=["Integrações"])
 
 
 @integrations_router.get("/banks/providers", response_model=List[BankProvider])
-async def list_bank_providers(current_user: CurrentUser, db: DatabaseSession):
+def list_bank_providers(current_user: CurrentUser, db: DatabaseSession):
     """Lista bancos disponíveis para integração."""
     service = IntegrationService(db)
     return service.get_bank_providers()
 
 
 @integrations_router.get("/banks", response_model=List[BankIntegrationResponse])
-async def list_bank_integrations(current_user: CurrentUser, db: DatabaseSession):
+def list_bank_integrations(current_user: CurrentUser, db: DatabaseSession):
     """Lista integrações bancárias do usuário."""
     service = IntegrationService(db)
     integrations = service.get_user_bank_integrations(current_user.id)
@@ -249,7 +419,7 @@ async def list_bank_integrations(current_user: CurrentUser, db: DatabaseSession)
 
 
 @integrations_router.post("/banks/{provider}/connect", response_model=BankIntegrationResponse)
-async def connect_bank(provider: str, current_user: CurrentUser, db: DatabaseSession):
+def connect_bank(provider: str, current_user: CurrentUser, db: DatabaseSession):
     """Conecta com um banco."""
     service = IntegrationService(db)
     integration = service.connect_bank(current_user.id, provider)
@@ -257,22 +427,49 @@ async def connect_bank(provider: str, current_user: CurrentUser, db: DatabaseSes
 
 
 @integrations_router.post("/banks/{provider}/disconnect", status_code=status.HTTP_204_NO_CONTENT)
-async def disconnect_bank(provider: str, current_user: CurrentUser, db: DatabaseSession):
+def disconnect_bank(provider: str, current_user: CurrentUser, db: DatabaseSession):
     """Desconecta de um banco."""
     service = IntegrationService(db)
     service.disconnect_bank(current_user.id, provider)
 
 
 @integrations_router.post("/banks/{provider}/sync", response_model=BankIntegrationResponse)
-async def sync_bank(provider: str, current_user: CurrentUser, db: DatabaseSession):
+def sync_bank(provider: str, current_user: CurrentUser, db: DatabaseSession):
     """Sincroniza dados com o banco."""
     service = IntegrationService(db)
     integration = service.sync_bank(current_user.id, provider)
     return BankIntegrationResponse.model_validate(integration)
 
 
+@integrations_router.post("/banks/{provider}/import", response_model=StatementImportResponse)
+def import_bank_statement(
+    provider: str,
+    current_user: CurrentUser,
+    db: DatabaseSession,
+    file: UploadFile = File(..., description="Extrato OFX ou CSV (Nubank, Itaú, Inter)"),
+    account_id: Optional[UUID] = Query(None, description="Conta de destino"),
+    credit_card_id: Optional[UUID] = Query(None, description="Cartão de destino (fatura)"),
+):
+    """
+    Importa um extrato bancário (OFX ou CSV) em streaming.
+    
+    Lançamentos já existentes na conta/cartão são ignorados, então reenviar
+    extratos com períodos sobrepostos é seguro. A resposta traz as contagens
+    e a vazão da importação (linhas/s).
+    """
+    service = IntegrationService(db)
+    return service.import_statement(
+        current_user.id,
+        provider,
+        file.file,
+        filename=file.filename,
+        account_id=account_id,
+        credit_card_id=credit_card_id,
+    )
+
+
 @integrations_router.get("/whatsapp", response_model=WhatsAppSettingsResponse)
-async def get_whatsapp_settings(current_user: CurrentUser, db: DatabaseSession):
+def get_whatsapp_settings(current_user: CurrentUser, db: DatabaseSession):
     """Retorna configurações de WhatsApp."""
     service = IntegrationService(db)
     settings = service.get_whatsapp_settings(current_user.id)
@@ -282,7 +479,7 @@ async def get_whatsapp_settings(current_user: CurrentUser, db: DatabaseSession):
 
 
 @integrations_router.put("/whatsapp", response_model=WhatsAppSettingsResponse)
-async def update_whatsapp_settings(data: WhatsAppSettingsUpdate, current_user: CurrentUser, db: DatabaseSession):
+def update_whatsapp_settings(data: WhatsAppSettingsUpdate, current_user: CurrentUser, db: DatabaseSession):
     """Atualiza configurações de WhatsApp."""
     service = IntegrationService(db)
     settings = service.update_whatsapp_settings(current_user.id, data)
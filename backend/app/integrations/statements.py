@@ -0,0 +1,253 @@
+"""
+Leitura de extratos bancários (OFX e CSV de Nubank, Itaú e Inter).
+
+Os parsers leem o arquivo em streaming, linha a linha, e produzem um
+`StatementLine` por lançamento — o arquivo nunca é carregado inteiro.
+"""
+
+import csv
+import io
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+
+class StatementError(ValueError):
+    """Linha do extrato que não pôde ser interpretada."""
+
+
+@dataclass
+class StatementLine:
+    """Lançamento lido do extrato (valor com sinal: negativo = saída)."""
+
+    date: date
+    amount: Decimal
+    description: str
+
+
+# Provedores com layout de CSV conhecido; OFX é aceito para qualquer banco.
+CSV_PROVIDERS = ("nubank", "itau", "inter")
+
+
+def open_statement(raw: BinaryIO, filename: Optional[str] = None) -> Tuple[io.TextIOWrapper, str]:
+    """
+    Abre o extrato como texto, sem lê-lo inteiro, e detecta o formato.
+
+    A codificação (UTF-8 ou Windows-1252, comuns em bancos brasileiros) e o
+    formato (`ofx` ou `csv`) são detectados pelo início do arquivo.
+
+    Returns:
+        Tupla com (texto em streaming, formato)
+    """
+    head = raw.read(64 * 1024)
+    raw.seek(0)
+
+    encoding = "utf-8-sig"
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Um caractere multibyte pode ter sido cortado no fim do trecho
+        if e.start < len(head) - 3:
+            encoding = "cp1252"
+
+    name = (filename or "").lower()
+    if name.endswith((".ofx", ".qfx")) or b"OFXHEADER" in head[:1024].upper() or b"<OFX>" in head.upper():
+        fmt = "ofx"
+    else:
+        fmt = "csv"
+
+    return io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline=""), fmt
+
+
+def parse_statement(
+    text: io.TextIOWrapper,
+    fmt: str,
+    provider: str,
+) -> Iterator[Union[StatementLine, StatementError]]:
+    """
+    Itera os lançamentos do extrato.
+
+    Linhas inválidas são produzidas como `StatementError` (e não levantadas),
+    para que a importação continue.
+    """
+    if fmt == "ofx":
+        return parse_ofx(text)
+    return parse_csv(text, provider)
+
+
+# ===========================================
+# OFX
+# ===========================================
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+
+def parse_ofx(lines: Iterator[str]) -> Iterator[Union[StatementLine, StatementError]]:
+    """
+    Lê os blocos `<STMTTRN>` de um OFX (SGML 1.x ou XML 2.x).
+
+    Aceita uma tag por linha ou várias na mesma linha.
+    """
+    current = None
+    for line in lines:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if not closing:
+                    current = {}
+                elif current is not None:
+                    yield _ofx_line(current)
+                    current = None
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+
+
+def _ofx_line(fields: dict) -> Union[StatementLine, StatementError]:
+    try:
+        posted = datetime.strptime(fields["DTPOSTED"][:8], "%Y%m%d").date()
+        amount = parse_amount(fields["TRNAMT"])
+    except (KeyError, ValueError) as e:
+        return StatementError(f"Lançamento OFX inválido: {e}")
+
+    description = fields.get("MEMO") or fields.get("NAME") or "Lançamento importado"
+    return StatementLine(date=posted, amount=amount, description=description)
+
+
+# ===========================================
+# CSV
+# ===========================================
+
+# Colunas aceitas por provedor, já normalizadas (minúsculas, sem acento).
+_CSV_COLUMNS = {
+    "nubank": {
+        # Conta: Data,Valor,Identificador,Descrição / Cartão: date,title,amount
+        "date": ("data", "date"),
+        "description": ("descricao", "title"),
+        "amount": ("valor", "amount"),
+    },
+    "itau": {
+        "date": ("data",),
+        "description": ("lancamento", "historico", "descricao"),
+        "amount": ("valor", "valor (r$)"),
+    },
+    "inter": {
+        "date": ("data lancamento", "data"),
+        "description": ("descricao", "historico"),
+        "amount": ("valor",),
+    },
+}
+
+# Fatura do cartão Nubank traz despesas com valor positivo; o sinal é invertido
+# para seguir a convenção de `StatementLine` (negativo = saída), como no OFX.
+_NUBANK_CARD_HEADER = ("date", "title", "amount")
+
+
+def parse_csv(text: io.TextIOWrapper, provider: str) -> Iterator[Union[StatementLine, StatementError]]:
+    """
+    Lê o CSV exportado pelo banco.
+
+    O cabeçalho é procurado nas primeiras linhas (o Inter inclui um preâmbulo);
+    sem cabeçalho, assume `data;descrição;valor` (layout do Itaú).
+    """
+    columns = _CSV_COLUMNS[provider]
+
+    for line_num, line in enumerate(text, start=1):
+        delimiter = ";" if line.count(";") > line.count(",") else ","
+        row = next(csv.reader([line], delimiter=delimiter), [])
+        if not any(cell.strip() for cell in row):
+            continue
+
+        header = [_normalize(cell) for cell in row]
+        positions = _find_columns(header, columns)
+        if positions is not None:
+            negate = tuple(header[:3]) == _NUBANK_CARD_HEADER
+            rows = csv.reader(text, delimiter=delimiter)
+            break
+        if _looks_like_date(row[0]):
+            positions, negate = (0, 1, 2), False
+            rows = csv.reader(_chain([line], text), delimiter=delimiter)
+            break
+        if line_num >= 20:
+            return  # Nenhum cabeçalho reconhecido
+    else:
+        return
+
+    for row in rows:
+        if any(cell.strip() for cell in row):
+            yield _csv_line(row, positions, negate)
+
+
+def _csv_line(row: List[str], positions: tuple, negate: bool) -> Union[StatementLine, StatementError]:
+    date_pos, desc_pos, amount_pos = positions
+    try:
+        posted = parse_date(row[date_pos])
+        amount = parse_amount(row[amount_pos])
+    except (IndexError, ValueError) as e:
+        return StatementError(f"Linha CSV inválida: {e}")
+
+    return StatementLine(
+        date=posted,
+        amount=-amount if negate else amount,
+        description=row[desc_pos].strip() or "Lançamento importado",
+    )
+
+
+def _find_columns(header: List[str], columns: dict) -> Optional[tuple]:
+    positions = []
+    for field in ("date", "description", "amount"):
+        # Os nomes seguem a ordem de preferência (ex: Inter tem Histórico e Descrição)
+        matches = [header.index(name) for name in columns[field] if name in header]
+        if not matches:
+            return None
+        positions.append(matches[0])
+    return tuple(positions)
+
+
+def _chain(first: List[str], rest: Iterator[str]) -> Iterator[str]:
+    yield from first
+    yield from rest
+
+
+# ===========================================
+# Conversões
+# ===========================================
+
+_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%d-%m-%Y")
+
+
+def parse_date(value: str) -> date:
+    """Converte datas nos formatos usados pelos bancos (dd/mm/aaaa, ISO...)."""
+    value = value.strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"data inválida '{value}'")
+
+
+def parse_amount(value: str) -> Decimal:
+    """Converte valores como `-1.234,56`, `1234.56` ou `R$ 10,00` em Decimal."""
+    cleaned = value.strip().replace("R$", "").replace(" ", "")
+    if "," in cleaned:
+        cleaned = cleaned.replace(".", "").replace(",", ".")
+    try:
+        return Decimal(cleaned).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"valor inválido '{value}'")
+
+
+def _looks_like_date(value: str) -> bool:
+    try:
+        parse_date(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _normalize(value: str) -> str:
+    value = unicodedata.normalize("NFKD", value.strip().lower())
+    return "".join(c for c in value if not unicodedata.combining(c))
@@ -2,12 +2,13 @@
 Investments module - Carteiras de investimento.
 """
 
-from app.investments.models import InvestmentPortfolio, InvestmentEntry, InvestmentEntryType
+from app.investments.models import InvestmentPortfolio, InvestmentEntry, InvestmentEntryType, InvestmentValuation
 from app.investments.service import investments_router
 
 __all__ = [
     "InvestmentPortfolio",
     "InvestmentEntry",
     "InvestmentEntryType",
+    "InvestmentValuation",
     "investments_router",
 ]
@@ -1,16 +1,16 @@
 """
-Models de Investimentos - Carteiras e Movimentações.
+Models de Investimentos - Carteiras, Movimentações e Avaliações.
 """
 
 import uuid
 from datetime import datetime, date, timezone
 from decimal import Decimal
 from enum import Enum as PyEnum
-from sqlalchemy import Column, String, Boolean, DateTime, Date, Numeric, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Date, Numeric, ForeignKey, Enum, Text, UniqueConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
-from app.core.database import Base
+from app.core.database import Base, enum_values
 
 
 class InvestmentEntryType(str, PyEnum):
@@ -36,6 +36,7 @@ class InvestmentPortfolio(Base):
     # Relacionamentos
     user = relationship("User", back_populates="investment_portfolios")
     entries = relationship("InvestmentEntry", back_populates="portfolio", cascade="all, delete-orphan")
+    valuations = relationship("InvestmentValuation", back_populates="portfolio", cascade="all, delete-orphan")
     
     def __repr__(self) -> str:
         return f"<InvestmentPortfolio(id={self.id}, name={self.name})>"
@@ -45,10 +46,21 @@ class InvestmentEntry(Base):
     """Movimentação de Investimento (Aporte/Resgate)."""
     
     __tablename__ = "investment_entries"
+    __table_args__ = (
+        # Listagem paginada por keyset e totais por período de uma carteira (migration 006)
+        Index(
+            "ix_investment_entries_portfolio_date",
+            "portfolio_id",
+            text("date DESC"),
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_include=["type", "amount"],
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     portfolio_id = Column(UUID(as_uuid=True), ForeignKey("investment_portfolios.id", ondelete="CASCADE"), nullable=False, index=True)
-    type = Column(Enum(InvestmentEntryType), nullable=False)
+    type = Column(Enum(InvestmentEntryType, values_callable=enum_values), nullable=False)
     amount = Column(Numeric(15, 2), nullable=False)
     date = Column(Date, nullable=False, index=True)
     description = Column(String(255), nullable=True)
@@ -59,3 +71,25 @@ class InvestmentEntry(Base):
     
     def __repr__(self) -> str:
         return f"<InvestmentEntry(id={self.id}, type={self.type}, amount={self.amount})>"
+
+
+class InvestmentValuation(Base):
+    """Avaliação manual da carteira (valor de mercado no fim do dia)."""
+    
+    __tablename__ = "investment_valuations"
+    __table_args__ = (
+        UniqueConstraint("portfolio_id", "date", name="uq_investment_valuations_portfolio_date"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    portfolio_id = Column(UUID(as_uuid=True), ForeignKey("investment_portfolios.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+    value = Column(Numeric(15, 2), nullable=False)
+    description = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    
+    # Relacionamentos
+    portfolio = relationship("InvestmentPortfolio", back_populates="valuations")
+    
+    def __repr__(self) -> str:
+        return f"<InvestmentValuation(portfolio_id={self.portfolio_id}, date={self.date}, value={self.value})>"
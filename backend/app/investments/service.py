@@ -2,17 +2,22 @@
 Investments module - Schemas, Repository, Service e Router.
 """
 
+import datetime as dt
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List
+from enum import Enum as PyEnum
+from typing import Optional, List, Tuple, Union
 from uuid import UUID
 from pydantic import BaseModel, Field, ConfigDict
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from fastapi import APIRouter, HTTPException, status, Query
+from sqlalchemy import Date, case, cast, func, tuple_
+from fastapi import APIRouter, HTTPException, status, Query, Response
 
-from app.core.dependencies import CurrentUser, DatabaseSession
-from app.investments.models import InvestmentPortfolio, InvestmentEntry, InvestmentEntryType
+from app.core.cache import invalidate_user, user_cache
+from app.core.dependencies import CurrentUser, DatabaseSession, ReadSession, ETagCheck
+from app.core.pagination import encode_cursor, decode_cursor
+from app.investments.models import InvestmentPortfolio, InvestmentEntry, InvestmentEntryType, InvestmentValuation
+from app.investments.performance import NO_POINTS, Frequency, PerformanceSeries, compute_series, group_rows
 
 
 # ===========================================
@@ -50,7 +55,7 @@ class PortfolioResponse(BaseModel):
 class EntryCreate(BaseModel):
     type: InvestmentEntryType
     amount: Decimal = Field(..., gt=0)
-    date: date
+    date: dt.date
     description: Optional[str] = Field(None, max_length=255)
 
 
@@ -61,11 +66,72 @@ class EntryResponse(BaseModel):
     portfolio_id: UUID
     type: InvestmentEntryType
     amount: Decimal
-    date: date
+    date: dt.date
     description: Optional[str] = None
     created_at: datetime
 
 
+class EntryPeriod(str, PyEnum):
+    """Agrupamento do modo só-totais da listagem de movimentações."""
+    DAY = "day"
+    MONTH = "month"
+    YEAR = "year"
+
+
+class EntryPeriodTotal(BaseModel):
+    """Totais de movimentações de um período (início do período em `period`)."""
+    period: date
+    deposits: Decimal
+    withdrawals: Decimal
+    net: Decimal
+    count: int
+
+
+class ValuationCreate(BaseModel):
+    date: dt.date
+    value: Decimal = Field(..., ge=0)
+    description: Optional[str] = Field(None, max_length=255)
+
+
+class ValuationResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UUID
+    portfolio_id: UUID
+    date: dt.date
+    value: Decimal
+    description: Optional[str] = None
+    created_at: datetime
+
+
+class PerformanceSeriesResponse(BaseModel):
+    """Série em colunas: o item i de cada lista corresponde a `dates[i]`."""
+    dates: List[date]
+    invested: List[float]
+    withdrawn: List[float]
+    net_contributions: List[float]
+    contributions: List[float]
+    market_value: List[float]
+    twr: List[float]
+
+
+class PortfolioPerformance(BaseModel):
+    """Capital, valor de mercado e rentabilidades de uma carteira no período."""
+    portfolio_id: UUID
+    name: str
+    frequency: Frequency
+    start_date: date
+    end_date: date
+    total_invested: Decimal
+    total_withdrawn: Decimal
+    net_contributions: Decimal
+    market_value: Decimal
+    xirr: Optional[float] = None            # Ao ano
+    twr: Optional[float] = None             # Acumulado no período
+    twr_annualized: Optional[float] = None  # Só para períodos de um ano ou mais
+    series: PerformanceSeriesResponse
+
+
 # ===========================================
 # Repository
 # ===========================================
@@ -101,10 +167,68 @@ class InvestmentRepository:
         self.db.delete(portfolio)
         self.db.commit()
     
-    def get_entries(self, portfolio_id: UUID) -> List[InvestmentEntry]:
-        return self.db.query(InvestmentEntry).filter(
-            InvestmentEntry.portfolio_id == portfolio_id
-        ).order_by(InvestmentEntry.date.desc()).all()
+    def get_entries(
+        self,
+        portfolio_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[date, datetime, UUID]] = None,
+    ) -> List[InvestmentEntry]:
+        """
+        Movimentações da carteira, da mais recente para a mais antiga.
+        
+        Se `after` for informado (chave `(date, created_at, id)` da última linha
+        da página anterior), pagina por keyset no índice
+        `ix_investment_entries_portfolio_date`.
+        """
+        query = self._entries_in_range(
+            self.db.query(InvestmentEntry), portfolio_id, start_date, end_date
+        ).order_by(
+            InvestmentEntry.date.desc(),
+            InvestmentEntry.created_at.desc(),
+            InvestmentEntry.id.desc(),
+        )
+        if after:
+            query = query.filter(
+                tuple_(InvestmentEntry.date, InvestmentEntry.created_at, InvestmentEntry.id) < tuple_(*after)
+            )
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+    
+    def get_entry_totals(
+        self,
+        portfolio_id: UUID,
+        period: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> list:
+        """Aportes, resgates e quantidade por período (`day`, `month` ou `year`), do mais recente ao mais antigo."""
+        period_start = cast(func.date_trunc(period, InvestmentEntry.date), Date).label("period")
+        query = self._entries_in_range(
+            self.db.query(
+                period_start,
+                func.coalesce(func.sum(case(
+                    (InvestmentEntry.type == InvestmentEntryType.DEPOSIT, InvestmentEntry.amount), else_=0
+                )), 0).label("deposits"),
+                func.coalesce(func.sum(case(
+                    (InvestmentEntry.type == InvestmentEntryType.WITHDRAWAL, InvestmentEntry.amount), else_=0
+                )), 0).label("withdrawals"),
+                func.count(InvestmentEntry.id).label("count"),
+            ),
+            portfolio_id, start_date, end_date,
+        )
+        return query.group_by(period_start).order_by(period_start.desc()).all()
+    
+    @staticmethod
+    def _entries_in_range(query, portfolio_id: UUID, start_date: Optional[date], end_date: Optional[date]):
+        query = query.filter(InvestmentEntry.portfolio_id == portfolio_id)
+        if start_date:
+            query = query.filter(InvestmentEntry.date >= start_date)
+        if end_date:
+            query = query.filter(InvestmentEntry.date <= end_date)
+        return query
     
     def create_entry(self, entry: InvestmentEntry) -> InvestmentEntry:
         self.db.add(entry)
@@ -112,22 +236,87 @@ class InvestmentRepository:
         self.db.refresh(entry)
         return entry
     
-    def calculate_portfolio_balance(self, portfolio_id: UUID) -> dict:
-        deposits = self.db.query(func.sum(InvestmentEntry.amount)).filter(
-            InvestmentEntry.portfolio_id == portfolio_id,
-            InvestmentEntry.type == InvestmentEntryType.DEPOSIT
-        ).scalar() or Decimal("0.00")
+    def get_signed_flows(self, portfolio_ids: List[UUID], end_date: date) -> List[Tuple[UUID, date, Decimal]]:
+        """Movimentações (carteira, data, valor com sinal) ordenadas por carteira e data."""
+        if not portfolio_ids:
+            return []
+        signed = case(
+            (InvestmentEntry.type == InvestmentEntryType.WITHDRAWAL, -InvestmentEntry.amount),
+            else_=InvestmentEntry.amount,
+        )
+        return self.db.query(InvestmentEntry.portfolio_id, InvestmentEntry.date, signed).filter(
+            InvestmentEntry.portfolio_id.in_(portfolio_ids),
+            InvestmentEntry.date <= end_date,
+        ).order_by(InvestmentEntry.portfolio_id, InvestmentEntry.date).all()
+    
+    def get_valuation_points(self, portfolio_ids: List[UUID], end_date: date) -> List[Tuple[UUID, date, Decimal]]:
+        """Avaliações (carteira, data, valor) ordenadas por carteira e data."""
+        if not portfolio_ids:
+            return []
+        return self.db.query(InvestmentValuation.portfolio_id, InvestmentValuation.date, InvestmentValuation.value).filter(
+            InvestmentValuation.portfolio_id.in_(portfolio_ids),
+            InvestmentValuation.date <= end_date,
+        ).order_by(InvestmentValuation.portfolio_id, InvestmentValuation.date).all()
+    
+    def get_valuations(self, portfolio_id: UUID) -> List[InvestmentValuation]:
+        return self.db.query(InvestmentValuation).filter(
+            InvestmentValuation.portfolio_id == portfolio_id
+        ).order_by(InvestmentValuation.date.desc()).all()
+    
+    def get_valuation_by_date(self, portfolio_id: UUID, valuation_date: date) -> Optional[InvestmentValuation]:
+        return self.db.query(InvestmentValuation).filter(
+            InvestmentValuation.portfolio_id == portfolio_id,
+            InvestmentValuation.date == valuation_date,
+        ).first()
+    
+    def get_valuation_by_id(self, valuation_id: UUID, portfolio_id: UUID) -> Optional[InvestmentValuation]:
+        return self.db.query(InvestmentValuation).filter(
+            InvestmentValuation.id == valuation_id,
+            InvestmentValuation.portfolio_id == portfolio_id,
+        ).first()
+    
+    def save_valuation(self, valuation: InvestmentValuation) -> InvestmentValuation:
+        self.db.add(valuation)
+        self.db.commit()
+        self.db.refresh(valuation)
+        return valuation
+    
+    def delete_valuation(self, valuation: InvestmentValuation) -> None:
+        self.db.delete(valuation)
+        self.db.commit()
+    
+    def get_portfolios_with_balance(
+        self,
+        user_id: UUID,
+        include_inactive: bool = False,
+        portfolio_id: Optional[UUID] = None,
+    ) -> List[Tuple[InvestmentPortfolio, Decimal, Decimal]]:
+        """
+        Carteiras com total aportado e resgatado, em uma única consulta.
         
-        withdrawals = self.db.query(func.sum(InvestmentEntry.amount)).filter(
-            InvestmentEntry.portfolio_id == portfolio_id,
-            InvestmentEntry.type == InvestmentEntryType.WITHDRAWAL
-        ).scalar() or Decimal("0.00")
+        Returns:
+            Lista de tuplas (carteira, aportes, resgates)
+        """
+        query = (
+            self.db.query(
+                InvestmentPortfolio,
+                func.coalesce(func.sum(case(
+                    (InvestmentEntry.type == InvestmentEntryType.DEPOSIT, InvestmentEntry.amount), else_=0
+                )), 0).label("deposits"),
+                func.coalesce(func.sum(case(
+                    (InvestmentEntry.type == InvestmentEntryType.WITHDRAWAL, InvestmentEntry.amount), else_=0
+                )), 0).label("withdrawals"),
+            )
+            .outerjoin(InvestmentEntry, InvestmentEntry.portfolio_id == InvestmentPortfolio.id)
+            .filter(InvestmentPortfolio.user_id == user_id)
+        )
+        if not include_inactive and portfolio_id is None:
+            query = query.filter(InvestmentPortfolio.is_active == True)
+        if portfolio_id is not None:
+            query = query.filter(InvestmentPortfolio.id == portfolio_id)
         
-        return {
-            "total_invested": deposits,
-            "total_withdrawn": withdrawals,
-            "current_balance": deposits - withdrawals,
-        }
+        rows = query.group_by(InvestmentPortfolio.id).order_by(InvestmentPortfolio.name).all()
+        return [(row.InvestmentPortfolio, Decimal(row.deposits), Decimal(row.withdrawals)) for row in rows]
 
 
 # ===========================================
@@ -146,7 +335,9 @@ class InvestmentService:
             type=data.type,
             description=data.description,
         )
-        return self.repository.create_portfolio(portfolio)
+        portfolio = self.repository.create_portfolio(portfolio)
+        invalidate_user(user_id)
+        return portfolio
     
     def get_portfolio(self, portfolio_id: UUID, user_id: UUID) -> InvestmentPortfolio:
         portfolio = self.repository.get_portfolio_by_id(portfolio_id, user_id)
@@ -154,16 +345,37 @@ class InvestmentService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Carteira não encontrada")
         return portfolio
     
-    def get_all_portfolios(self, user_id: UUID, include_inactive: bool = False) -> List[dict]:
-        portfolios = self.repository.get_all_portfolios(user_id, include_inactive)
-        result = []
-        for p in portfolios:
-            balance = self.repository.calculate_portfolio_balance(p.id)
-            data = PortfolioResponse.model_validate(p).model_dump()
-            data["total_invested"] = balance["total_invested"]
-            data["current_balance"] = balance["current_balance"]
-            result.append(data)
-        return result
+    def get_all_portfolios(self, user_id: UUID, include_inactive: bool = False) -> List[PortfolioResponse]:
+        """Lista carteiras com saldos (uma consulta agrupada para todas)."""
+        rows = self.repository.get_portfolios_with_balance(user_id, include_inactive)
+        return [self.portfolio_response(*row) for row in rows]
+    
+    def get_portfolio_response(self, portfolio_id: UUID, user_id: UUID) -> PortfolioResponse:
+        """Carteira com saldos, em uma consulta."""
+        rows = self.repository.get_portfolios_with_balance(user_id, portfolio_id=portfolio_id)
+        if not rows:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Carteira não encontrada")
+        return self.portfolio_response(*rows[0])
+    
+    @staticmethod
+    def portfolio_response(
+        portfolio: InvestmentPortfolio,
+        deposits: Decimal = Decimal("0.00"),
+        withdrawals: Decimal = Decimal("0.00"),
+    ) -> PortfolioResponse:
+        """Monta a resposta direto dos campos (sem model_validate/model_dump por linha)."""
+        return PortfolioResponse(
+            id=portfolio.id,
+            user_id=portfolio.user_id,
+            name=portfolio.name,
+            type=portfolio.type,
+            description=portfolio.description,
+            is_active=portfolio.is_active,
+            created_at=portfolio.created_at,
+            updated_at=portfolio.updated_at,
+            total_invested=deposits,
+            current_balance=deposits - withdrawals,
+        )
     
     def update_portfolio(self, portfolio_id: UUID, user_id: UUID, data: PortfolioUpdate) -> InvestmentPortfolio:
         portfolio = self.get_portfolio(portfolio_id, user_id)
@@ -175,11 +387,14 @@ class InvestmentService:
             portfolio.description = data.description
         if data.is_active is not None:
             portfolio.is_active = data.is_active
-        return self.repository.update_portfolio(portfolio)
+        portfolio = self.repository.update_portfolio(portfolio)
+        invalidate_user(user_id)
+        return portfolio
     
     def delete_portfolio(self, portfolio_id: UUID, user_id: UUID) -> None:
         portfolio = self.get_portfolio(portfolio_id, user_id)
         self.repository.delete_portfolio(portfolio)
+        invalidate_user(user_id)
     
     def add_entry(self, portfolio_id: UUID, user_id: UUID, data: EntryCreate) -> InvestmentEntry:
         self.get_portfolio(portfolio_id, user_id)  # Verifica se existe
@@ -190,53 +405,238 @@ class InvestmentService:
             date=data.date,
             description=data.description,
         )
-        return self.repository.create_entry(entry)
+        entry = self.repository.create_entry(entry)
+        invalidate_user(user_id)
+        return entry
+    
+    def get_entries_page(
+        self,
+        portfolio_id: UUID,
+        user_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[InvestmentEntry], Optional[str]]:
+        """
+        Lista uma página de movimentações e o cursor da próxima página.
+        
+        Returns:
+            Tupla com (movimentações, próximo cursor ou None se for a última página)
+        """
+        self.get_portfolio(portfolio_id, user_id)
+        after = self._decode_cursor(cursor) if cursor else None
+        entries = self.repository.get_entries(
+            portfolio_id,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit + 1,  # Uma linha extra indica se há próxima página
+            after=after,
+        )
+        
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            last = entries[-1]
+            next_cursor = encode_cursor([last.date.isoformat(), last.created_at.isoformat(), last.id])
+        
+        return entries, next_cursor
     
-    def get_entries(self, portfolio_id: UUID, user_id: UUID) -> List[InvestmentEntry]:
+    def get_entry_totals(
+        self,
+        portfolio_id: UUID,
+        user_id: UUID,
+        period: EntryPeriod,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> List[EntryPeriodTotal]:
+        """Totais por período, sem as movimentações (uma consulta agrupada)."""
         self.get_portfolio(portfolio_id, user_id)
-        return self.repository.get_entries(portfolio_id)
+        rows = self.repository.get_entry_totals(portfolio_id, period.value, start_date, end_date)
+        return [
+            EntryPeriodTotal(
+                period=row.period,
+                deposits=Decimal(row.deposits),
+                withdrawals=Decimal(row.withdrawals),
+                net=Decimal(row.deposits) - Decimal(row.withdrawals),
+                count=row.count,
+            )
+            for row in rows
+        ]
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[date, datetime, UUID]:
+        """Converte o cursor opaco na chave `(date, created_at, id)`."""
+        entry_date, created_at, entry_id = decode_cursor(cursor, size=3)
+        try:
+            return date.fromisoformat(entry_date), datetime.fromisoformat(created_at), UUID(entry_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginação inválido",
+            )
+    
+    def save_valuation(self, portfolio_id: UUID, user_id: UUID, data: ValuationCreate) -> InvestmentValuation:
+        """Registra a avaliação do dia, substituindo a existente na mesma data."""
+        self.get_portfolio(portfolio_id, user_id)
+        valuation = self.repository.get_valuation_by_date(portfolio_id, data.date)
+        if valuation is None:
+            valuation = InvestmentValuation(portfolio_id=portfolio_id, date=data.date)
+        valuation.value = data.value
+        valuation.description = data.description
+        valuation = self.repository.save_valuation(valuation)
+        invalidate_user(user_id)
+        return valuation
+    
+    def get_valuations(self, portfolio_id: UUID, user_id: UUID) -> List[InvestmentValuation]:
+        self.get_portfolio(portfolio_id, user_id)
+        return self.repository.get_valuations(portfolio_id)
+    
+    def delete_valuation(self, portfolio_id: UUID, valuation_id: UUID, user_id: UUID) -> None:
+        self.get_portfolio(portfolio_id, user_id)
+        valuation = self.repository.get_valuation_by_id(valuation_id, portfolio_id)
+        if not valuation:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Avaliação não encontrada")
+        self.repository.delete_valuation(valuation)
+        invalidate_user(user_id)
+    
+    def get_performance(
+        self,
+        user_id: UUID,
+        portfolio_id: Optional[UUID] = None,
+        frequency: Frequency = Frequency.MONTHLY,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> List[PortfolioPerformance]:
+        """
+        Séries e rentabilidades por carteira (todas as ativas, ou uma).
+        
+        Duas consultas para todas as carteiras (movimentações e avaliações);
+        o cálculo é vetorizado em `app.investments.performance`. Sem
+        `start_date`, cada série começa na primeira movimentação/avaliação.
+        """
+        end = end_date or date.today()
+        if start_date and start_date > end:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A data inicial deve ser anterior à data final",
+            )
+        
+        if portfolio_id is not None:
+            portfolios = [self.get_portfolio(portfolio_id, user_id)]
+        else:
+            portfolios = self.repository.get_all_portfolios(user_id)
+        ids = [p.id for p in portfolios]
+        flows = group_rows(self.repository.get_signed_flows(ids, end))
+        valuations = group_rows(self.repository.get_valuation_points(ids, end))
+        
+        result = []
+        for portfolio in portfolios:
+            flow_dates, flow_values = flows.get(portfolio.id, NO_POINTS)
+            valuation_dates, valuation_values = valuations.get(portfolio.id, NO_POINTS)
+            start = start_date or self._first_date(flow_dates, valuation_dates, end)
+            series = compute_series(
+                flow_dates, flow_values, valuation_dates, valuation_values, start, end, frequency
+            )
+            result.append(self._performance_response(portfolio, frequency, start, end, series))
+        return result
+    
+    @staticmethod
+    def _first_date(flow_dates, valuation_dates, end: date) -> date:
+        firsts = [d[0] for d in (flow_dates, valuation_dates) if len(d)]
+        return min(firsts).item() if firsts else end
+    
+    @staticmethod
+    def _performance_response(
+        portfolio: InvestmentPortfolio,
+        frequency: Frequency,
+        start: date,
+        end: date,
+        series: PerformanceSeries,
+    ) -> PortfolioPerformance:
+        def money(values) -> List[float]:
+            return values.round(2).tolist()
+        
+        def rate(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value, 6) + 0.0  # Sem -0.0
+        
+        def total(values) -> Decimal:
+            return Decimal(f"{values[-1]:.2f}")
+        
+        return PortfolioPerformance(
+            portfolio_id=portfolio.id,
+            name=portfolio.name,
+            frequency=frequency,
+            start_date=start,
+            end_date=end,
+            total_invested=total(series.invested),
+            total_withdrawn=total(series.withdrawn),
+            net_contributions=total(series.net_contributions),
+            market_value=total(series.market_value),
+            xirr=rate(series.xirr),
+            twr=rate(float(series.twr[-1])),
+            twr_annualized=rate(series.twr_annualized),
+            series=PerformanceSeriesResponse(
+                dates=series.dates.tolist(),
+                invested=money(series.invested),
+                withdrawn=money(series.withdrawn),
+                net_contributions=money(series.net_contributions),
+                contributions=money(series.contributions),
+                market_value=money(series.market_value),
+                twr=series.twr.round(6).tolist(),
+            ),
+        )
 
 
 # ===========================================
 # Router
 # ===========================================
 
-investments_router = APIRouter(prefix="/investments", tags=["Investimentos"])
+investments_router = APIRouter(prefix="/investments", tags=["Investimentos"], dependencies=[ETagCheck])
 
 
 @investments_router.get("/portfolios", response_model=List[PortfolioResponse])
-async def list_portfolios(current_user: CurrentUser, db: DatabaseSession, include_inactive: bool = False):
+def list_portfolios(current_user: CurrentUser, db: DatabaseSession, include_inactive: bool = False):
     """Lista todas as carteiras de investimento."""
     service = InvestmentService(db)
     return service.get_all_portfolios(current_user.id, include_inactive)
 
 
 @investments_router.post("/portfolios", response_model=PortfolioResponse, status_code=status.HTTP_201_CREATED)
-async def create_portfolio(data: PortfolioCreate, current_user: CurrentUser, db: DatabaseSession):
+def create_portfolio(data: PortfolioCreate, current_user: CurrentUser, db: DatabaseSession):
     """Cria nova carteira de investimento."""
     service = InvestmentService(db)
     portfolio = service.create_portfolio(current_user.id, data)
-    balance = service.repository.calculate_portfolio_balance(portfolio.id)
-    response = PortfolioResponse.model_validate(portfolio)
-    response.total_invested = balance["total_invested"]
-    response.current_balance = balance["current_balance"]
-    return response
+    return service.portfolio_response(portfolio)  # Carteira nova, sem movimentações
+
+
+@investments_router.get("/performance", response_model=List[PortfolioPerformance])
+def get_performance(
+    current_user: CurrentUser,
+    db: ReadSession,
+    frequency: Frequency = Frequency.MONTHLY,
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+):
+    """Séries de capital e valor de mercado, XIRR e TWR de todas as carteiras ativas."""
+    service = InvestmentService(db)
+    end_date = end_date or date.today()
+    return user_cache.get_or_set(
+        current_user.id, "investments.performance",
+        {"frequency": frequency, "start_date": start_date, "end_date": end_date},
+        lambda: service.get_performance(current_user.id, None, frequency, start_date, end_date),
+    )
 
 
 @investments_router.get("/portfolios/{portfolio_id}", response_model=PortfolioResponse)
-async def get_portfolio(portfolio_id: UUID, current_user: CurrentUser, db: DatabaseSession):
+def get_portfolio(portfolio_id: UUID, current_user: CurrentUser, db: DatabaseSession):
     """Retorna detalhes de uma carteira."""
     service = InvestmentService(db)
-    portfolio = service.get_portfolio(portfolio_id, current_user.id)
-    balance = service.repository.calculate_portfolio_balance(portfolio.id)
-    response = PortfolioResponse.model_validate(portfolio)
-    response.total_invested = balance["total_invested"]
-    response.current_balance = balance["current_balance"]
-    return response
+    return service.get_portfolio_response(portfolio_id, current_user.id)
 
 
 @investments_router.put("/portfolios/{portfolio_id}", response_model=PortfolioResponse)
-async def update_portfolio(portfolio_id: UUID, data: PortfolioUpdate, current_user: CurrentUser, db: DatabaseSession):
+def update_portfolio(portfolio_id: UUID, data: PortfolioUpdate, current_user: CurrentUser, db: DatabaseSession):
     """Atualiza uma carteira."""
     service = InvestmentService(db)
     portfolio = service.update_portfolio(portfolio_id, current_user.id, data)
@@ -244,23 +644,95 @@ async def update_portfolio(portfolio_id: UUID, data: PortfolioUpdate, current_us
 
 
 @investments_router.delete("/portfolios/{portfolio_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_portfolio(portfolio_id: UUID, current_user: CurrentUser, db: DatabaseSession):
+def delete_portfolio(portfolio_id: UUID, current_user: CurrentUser, db: DatabaseSession):
     """Remove uma carteira."""
     service = InvestmentService(db)
     service.delete_portfolio(portfolio_id, current_user.id)
 
 
-@investments_router.get("/portfolios/{portfolio_id}/entries", response_model=List[EntryResponse])
-async def list_entries(portfolio_id: UUID, current_user: CurrentUser, db: DatabaseSession):
-    """Lista movimentações de uma carteira."""
+@investments_router.get(
+    "/portfolios/{portfolio_id}/entries",
+    response_model=Union[List[EntryResponse], List[EntryPeriodTotal]],
+)
+def list_entries(
+    portfolio_id: UUID,
+    response: Response,
+    current_user: CurrentUser,
+    db: DatabaseSession,
+    start_date: Optional[date] = Query(None, description="Data inicial"),
+    end_date: Optional[date] = Query(None, description="Data final"),
+    limit: int = Query(100, ge=1, le=500, description="Limite de resultados"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página"),
+    group_by: Optional[EntryPeriod] = Query(None, description="Só totais por período: day, month ou year"),
+):
+    """
+    Lista movimentações de uma carteira, da mais recente para a mais antiga.
+    
+    - Por período: GET .../entries?start_date=2024-01-01&end_date=2024-12-31
+    - Próxima página: GET .../entries?cursor=<header X-Next-Cursor da resposta anterior>
+    - Só totais: GET .../entries?group_by=month (aportes, resgates e quantidade
+      por mês, sem as movimentações; ignora `limit` e `cursor`)
+    
+    O corpo continua sendo a lista de movimentações; o cursor da próxima
+    página vem no header `X-Next-Cursor` (ausente na última página).
+    """
     service = InvestmentService(db)
-    entries = service.get_entries(portfolio_id, current_user.id)
+    if group_by is not None:
+        return service.get_entry_totals(portfolio_id, current_user.id, group_by, start_date, end_date)
+    
+    entries, next_cursor = service.get_entries_page(
+        portfolio_id, current_user.id, start_date, end_date, limit, cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [EntryResponse.model_validate(e) for e in entries]
 
 
 @investments_router.post("/portfolios/{portfolio_id}/entries", response_model=EntryResponse, status_code=status.HTTP_201_CREATED)
-async def create_entry(portfolio_id: UUID, data: EntryCreate, current_user: CurrentUser, db: DatabaseSession):
+def create_entry(portfolio_id: UUID, data: EntryCreate, current_user: CurrentUser, db: DatabaseSession):
     """Registra aporte ou resgate em uma carteira."""
     service = InvestmentService(db)
     entry = service.add_entry(portfolio_id, current_user.id, data)
     return EntryResponse.model_validate(entry)
+
+
+@investments_router.get("/portfolios/{portfolio_id}/performance", response_model=PortfolioPerformance)
+def get_portfolio_performance(
+    portfolio_id: UUID,
+    current_user: CurrentUser,
+    db: ReadSession,
+    frequency: Frequency = Frequency.MONTHLY,
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+):
+    """Série de capital e valor de mercado, XIRR e TWR de uma carteira."""
+    service = InvestmentService(db)
+    end_date = end_date or date.today()
+    return user_cache.get_or_set(
+        current_user.id, "investments.portfolio_performance",
+        {"portfolio_id": portfolio_id, "frequency": frequency, "start_date": start_date, "end_date": end_date},
+        lambda: service.get_performance(current_user.id, portfolio_id, frequency, start_date, end_date)[0],
+    )
+
+
+@investments_router.get("/portfolios/{portfolio_id}/valuations", response_model=List[ValuationResponse])
+def list_valuations(portfolio_id: UUID, current_user: CurrentUser, db: DatabaseSession):
+    """Lista avaliações manuais de uma carteira."""
+    service = InvestmentService(db)
+    valuations = service.get_valuations(portfolio_id, current_user.id)
+    return [ValuationResponse.model_validate(v) for v in valuations]
+
+
+@investments_router.post("/portfolios/{portfolio_id}/valuations", response_model=ValuationResponse, status_code=status.HTTP_201_CREATED)
+def create_valuation(portfolio_id: UUID, data: ValuationCreate, current_user: CurrentUser, db: DatabaseSession):
+    """Registra o valor de mercado da carteira em uma data (substitui o da mesma data)."""
+    service = InvestmentService(db)
+    valuation = service.save_valuation(portfolio_id, current_user.id, data)
+    return ValuationResponse.model_validate(valuation)
+
+
+@investments_router.delete("/portfolios/{portfolio_id}/valuations/{valuation_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_valuation(portfolio_id: UUID, valuation_id: UUID, current_user: CurrentUser, db: DatabaseSession):
+    """Remove uma avaliação."""
+    service = InvestmentService(db)
+    service.delete_valuation(portfolio_id, valuation_id, current_user.id)
@@ -5,10 +5,13 @@ Plataforma de gestão financeira pessoal.
 """
 
 from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.cache import identity_cache
+from app.core.database import engine, pool_metrics, read_engine, read_pool_metrics
 
 # Import de routers
 from app.users.router import auth_router, users_router
@@ -25,6 +28,9 @@ async def lifespan(app: FastAPI):
     """Gerenciador de ciclo de vida da aplicação."""
     print(f"🚀 Iniciando {settings.app_name} v{settings.app_version}")
     print(f"📍 Ambiente: {settings.environment}")
+    # Rotas que usam o banco são síncronas e rodam neste threadpool,
+    # sem bloquear o event loop
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
     yield
     print("👋 Encerrando aplicação...")
 
@@ -66,18 +72,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Paginação das movimentações de investimento
 )
 
 
 @app.get("/api/health", tags=["Health"])
 async def health_check():
     """Verifica se a API está funcionando."""
-    return {
+    health = {
         "status": "healthy",
         "app": settings.app_name,
         "version": settings.app_version,
         "environment": settings.environment,
+        "auth_cache": identity_cache.stats(),
+        "db_pool": pool_metrics.snapshot(engine.pool),
     }
+    if read_engine is not None:
+        health["db_read_pool"] = read_pool_metrics.snapshot(read_engine.pool)
+    return health
 
 
 # Registrar Routers
@@ -2,18 +2,25 @@
 Transactions module - Lançamentos financeiros e categorias.
 """
 
-from app.transactions.models import Transaction, Category, TransactionType, TransactionStatus
+from app.transactions.models import (
+    Transaction,
+    Category,
+    TransactionType,
+    TransactionStatus,
+    MonthlyUserCategoryTotal,
+)
 from app.transactions.schemas import (
     TransactionCreate,
     TransactionUpdate,
     TransactionResponse,
     TransactionListResponse,
+    TransactionBulkResponse,
     TransactionSummary,
     CashFlowResponse,
     CategoryCreate,
     CategoryResponse,
 )
-from app.transactions.repository import TransactionRepository, CategoryRepository
+from app.transactions.repository import TransactionRepository, CategoryRepository, MonthlyRollupRepository
 from app.transactions.service import TransactionService, CategoryService
 from app.transactions.router import transactions_router, categories_router
 
@@ -22,16 +29,19 @@ __all__ = [
     "Category",
     "TransactionType",
     "TransactionStatus",
+    "MonthlyUserCategoryTotal",
     "TransactionCreate",
     "TransactionUpdate",
     "TransactionResponse",
     "TransactionListResponse",
+    "TransactionBulkResponse",
     "TransactionSummary",
     "CashFlowResponse",
     "CategoryCreate",
     "CategoryResponse",
     "TransactionRepository",
     "CategoryRepository",
+    "MonthlyRollupRepository",
     "TransactionService",
     "CategoryService",
     "transactions_router",
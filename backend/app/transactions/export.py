@@ -0,0 +1,204 @@
+"""
+Exportação de transações em streaming (CSV, NDJSON e Parquet).
+
+As linhas vêm do banco por cursor no servidor e são serializadas em lotes,
+então a memória usada não depende do tamanho do histórico exportado.
+"""
+
+import csv
+import io
+import json
+from decimal import Decimal
+from enum import Enum
+from typing import Iterator, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from app.core.database import SessionLocal
+from app.transactions.repository import TransactionRepository
+
+
+# Colunas exportadas, na ordem do arquivo
+EXPORT_COLUMNS = [
+    "id",
+    "date",
+    "type",
+    "status",
+    "description",
+    "amount",
+    "account_name",
+    "credit_card_name",
+    "category_name",
+    "is_recurring",
+    "notes",
+    "created_at",
+]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+BATCH_SIZE = 1000  # Linhas por lote do cursor e por bloco enviado
+
+
+def check_format(fmt: str) -> None:
+    """Valida o formato antes de iniciar o streaming (erros depois viram resposta truncada)."""
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Exportação parquet indisponível: instale o pacote pyarrow"
+            )
+
+
+def export_transactions(user_id: UUID, fmt: str, **filters) -> Iterator[bytes]:
+    """
+    Gera o arquivo de exportação em blocos de bytes.
+
+    Abre a própria sessão: o gerador roda enquanto a resposta é enviada,
+    depois que a sessão da requisição já foi fechada.
+
+    Args:
+        user_id: Dono das transações
+        fmt: `csv`, `ndjson` ou `parquet`
+        **filters: Mesmos filtros da listagem (start_date, tx_type, ...)
+    """
+    db = SessionLocal()
+    try:
+        rows = TransactionRepository(db).iter_export(user_id, batch_size=BATCH_SIZE, **filters)
+        writer = {"csv": _write_csv, "ndjson": _write_ndjson, "parquet": _write_parquet}[fmt]
+        yield from writer(rows)
+    finally:
+        db.close()
+
+
+def _value(value):
+    """Converte valores do banco para texto/JSON."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _write_csv(rows) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield _drain(buffer)  # Cabeçalho sai antes da consulta ao banco
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_value(v) for v in row])
+        if count % BATCH_SIZE == 0:
+            yield _drain(buffer)
+
+    if buffer.tell():
+        yield _drain(buffer)
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def _write_ndjson(rows) -> Iterator[bytes]:
+    lines = []
+    for count, row in enumerate(rows, start=1):
+        lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, map(_value, row))), ensure_ascii=False))
+        # A primeira linha sai sozinha, para o download começar logo
+        if count == 1 or len(lines) >= BATCH_SIZE:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Arquivo somente-escrita que acumula bytes até serem enviados."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> Optional[bytes]:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data or None
+
+
+def _write_parquet(rows) -> Iterator[bytes]:
+    """Um row group por lote; cada row group é enviado assim que escrito."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("date", pa.date32()),
+        ("type", pa.string()),
+        ("status", pa.string()),
+        ("description", pa.string()),
+        ("amount", pa.decimal128(15, 2)),
+        ("account_name", pa.string()),
+        ("credit_card_name", pa.string()),
+        ("category_name", pa.string()),
+        ("is_recurring", pa.bool_()),
+        ("notes", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def flush(batch):
+        columns = list(zip(*batch))
+        arrays = [
+            pa.array([_arrow_value(name, v) for v in values], type=schema.field(name).type)
+            for name, values in zip(EXPORT_COLUMNS, columns)
+        ]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        return sink.drain()
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            data = flush(batch)
+            batch = []
+            if data:
+                yield data
+
+    if batch:
+        data = flush(batch)
+        if data:
+            yield data
+
+    writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def _arrow_value(name: str, value):
+    if name in ("id", "type", "status") and value is not None:
+        return _value(value)
+    return value
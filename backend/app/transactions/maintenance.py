@@ -0,0 +1,112 @@
+"""
+Tarefas de manutenção de Transações (executadas fora da API).
+
+Uso:
+    python -m app.transactions.maintenance rebuild-rollup [--user-id UUID]
+    python -m app.transactions.maintenance check-rollup [--user-id UUID]
+    python -m app.transactions.maintenance verify-balances [--user-id UUID]
+    python -m app.transactions.maintenance repair-balances [--user-id UUID]
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.database import SessionLocal
+from app.accounts.service import AccountService
+from app.transactions.repository import TransactionRepository, MonthlyRollupRepository
+
+
+def rebuild_rollup(user_id: Optional[UUID] = None) -> int:
+    """Recria o rollup mensal a partir das transações."""
+    db = SessionLocal()
+    try:
+        rows = MonthlyRollupRepository(db).rebuild(user_id)
+        print(f"✅ Rollup mensal recriado: {rows} linhas")
+        return 0
+    finally:
+        db.close()
+
+
+def check_rollup(user_id: Optional[UUID] = None) -> int:
+    """Compara o rollup mensal com as transações; retorna 1 se houver divergência."""
+    db = SessionLocal()
+    try:
+        divergences = MonthlyRollupRepository(db).find_inconsistencies(user_id)
+    finally:
+        db.close()
+
+    if not divergences:
+        print("✅ Rollup mensal consistente com as transações")
+        return 0
+
+    print(f"❌ {len(divergences)} divergência(s) no rollup mensal:")
+    for item in divergences:
+        print(
+            f"   user={item['user_id']} mês={item['month']} tipo={item['type']} "
+            f"categoria={item['category_id']} conta={item['account_id']} cartão={item['credit_card_id']}: "
+            f"esperado {item['expected_total']} ({item['expected_count']}), "
+            f"rollup {item['rollup_total']} ({item['rollup_count']})"
+        )
+    return 1
+
+
+def verify_balances(user_id: Optional[UUID] = None) -> int:
+    """Compara o saldo das contas com as transações; retorna 1 se houver divergência."""
+    db = SessionLocal()
+    try:
+        divergences = TransactionRepository(db).find_balance_divergences(user_id)
+    finally:
+        db.close()
+
+    if not divergences:
+        print("✅ Saldos das contas consistentes com as transações")
+        return 0
+
+    print(f"❌ {len(divergences)} conta(s) com saldo divergente:")
+    for item in divergences:
+        print(
+            f"   user={item['user_id']} conta={item['account_id']} ({item['name']}): "
+            f"esperado {item['expected_balance']}, gravado {item['current_balance']}"
+        )
+    return 1
+
+
+def repair_balances(user_id: Optional[UUID] = None) -> int:
+    """Recalcula o saldo das contas divergentes a partir das transações."""
+    db = SessionLocal()
+    try:
+        divergences = TransactionRepository(db).find_balance_divergences(user_id)
+        service = AccountService(db)
+        for item in divergences:
+            service.recalculate_balance(item["account_id"])
+        print(f"✅ Saldos recalculados: {len(divergences)} conta(s)")
+        return 0
+    finally:
+        db.close()
+
+
+COMMANDS = {
+    "rebuild-rollup": rebuild_rollup,
+    "check-rollup": check_rollup,
+    "verify-balances": verify_balances,
+    "repair-balances": repair_balances,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Manutenção de transações")
+    parser.add_argument(
+        "command",
+        choices=list(COMMANDS),
+        help="Tarefa a executar",
+    )
+    parser.add_argument("--user-id", type=UUID, default=None, help="Restringe a um usuário")
+    args = parser.parse_args(argv)
+
+    return COMMANDS[args.command](args.user_id)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
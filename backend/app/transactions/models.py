@@ -2,15 +2,19 @@
 Models de Transações (Lançamentos) e Categorias.
 """
 
+import hashlib
+import re
+import unicodedata
 import uuid
 from datetime import datetime, date, timezone
 from decimal import Decimal
+from typing import Optional
 from enum import Enum as PyEnum
-from sqlalchemy import Column, String, Boolean, DateTime, Date, Numeric, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Date, Numeric, Integer, ForeignKey, Enum, Text, Index, text, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
-from app.core.database import Base
+from app.core.database import Base, enum_values
 
 
 class TransactionType(str, PyEnum):
@@ -52,7 +56,7 @@ class Category(Base):
         nullable=False,
     )
     type = Column(
-        Enum(TransactionType),
+        Enum(TransactionType, values_callable=enum_values),
         nullable=False,
     )
     icon = Column(
@@ -122,7 +126,7 @@ class Transaction(Base):
         index=True,
     )
     type = Column(
-        Enum(TransactionType),
+        Enum(TransactionType, values_callable=enum_values),
         nullable=False,
         index=True,
     )
@@ -140,7 +144,7 @@ class Transaction(Base):
         index=True,
     )
     status = Column(
-        Enum(TransactionStatus),
+        Enum(TransactionStatus, values_callable=enum_values),
         nullable=False,
         default=TransactionStatus.PAID,
     )
@@ -158,6 +162,10 @@ class Transaction(Base):
         Text,
         nullable=True,
     )
+    fingerprint = Column(
+        String(64),  # Ver `transaction_fingerprint`; usado na deduplicação de importações
+        nullable=True,
+    )
     created_at = Column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -178,3 +186,155 @@ class Transaction(Base):
     
     def __repr__(self) -> str:
         return f"<Transaction(id={self.id}, type={self.type}, amount={self.amount})>"
+
+
+def normalize_description(description: str) -> str:
+    """Minúsculas, sem acentos e com espaços colapsados (para comparar descrições)."""
+    text_ = unicodedata.normalize("NFKD", description)
+    text_ = "".join(c for c in text_ if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", text_).strip().lower()
+
+
+def transaction_fingerprint(
+    account_id: Optional[uuid.UUID],
+    credit_card_id: Optional[uuid.UUID],
+    tx_date: date,
+    amount: Decimal,
+    description: str,
+) -> str:
+    """
+    Impressão digital de um lançamento: SHA-256 de
+    `(conta ou cartão, data, valor, descrição normalizada)`.
+    
+    Lançamentos iguais do mesmo extrato geram a mesma impressão, o que permite
+    deduplicar importações com uma consulta indexada por lote.
+    """
+    source = account_id or credit_card_id
+    key = "|".join([
+        str(source),
+        tx_date.isoformat(),
+        str(Decimal(amount).quantize(Decimal("0.01"))),
+        normalize_description(description),
+    ])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+# Índices compostos/parciais para as consultas quentes (migration 002).
+# O predicado usa o rótulo que o ORM grava e compara (valor do enum, ver `enum_values`).
+_active = text("status <> 'cancelled'")
+
+Index(
+    "ix_transactions_user_date_created",
+    Transaction.user_id,
+    Transaction.date.desc(),
+    Transaction.created_at.desc(),
+    Transaction.id.desc(),
+)
+Index(
+    "ix_transactions_user_type_date_active",
+    Transaction.user_id,
+    Transaction.type,
+    Transaction.date,
+    postgresql_include=["amount", "category_id"],
+    postgresql_where=_active,
+)
+Index(
+    "ix_transactions_user_date_active",
+    Transaction.user_id,
+    Transaction.date,
+    postgresql_include=["type", "amount"],
+    postgresql_where=_active,
+)
+Index(
+    "ix_transactions_account_type_active",
+    Transaction.account_id,
+    Transaction.type,
+    postgresql_include=["amount"],
+    postgresql_where=_active,
+)
+Index(
+    "ix_transactions_card_date_active",
+    Transaction.credit_card_id,
+    Transaction.date,
+    postgresql_include=["type", "amount"],
+    postgresql_where=_active,
+)
+# Deduplicação de importações (migration 004)
+Index(
+    "ix_transactions_user_fingerprint",
+    Transaction.user_id,
+    Transaction.fingerprint,
+)
+
+
+class MonthlyUserCategoryTotal(Base):
+    """
+    Rollup mensal das transações não canceladas.
+    
+    Uma linha por (usuário, mês, tipo, categoria, conta, cartão), mantida de
+    forma incremental pelo TransactionService. Serve as consultas de totais
+    em intervalos de meses completos sem reagregar `transactions`.
+    """
+    
+    __tablename__ = "monthly_user_category_totals"
+    
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    month = Column(
+        Date,  # Primeiro dia do mês
+        nullable=False,
+    )
+    type = Column(
+        Enum(TransactionType, values_callable=enum_values),
+        nullable=False,
+    )
+    category_id = Column(
+        UUID(as_uuid=True),
+        nullable=True,
+    )
+    account_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("accounts.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    credit_card_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("credit_cards.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    total = Column(
+        Numeric(15, 2),
+        nullable=False,
+        default=Decimal("0.00"),
+    )
+    count = Column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    
+    def __repr__(self) -> str:
+        return f"<MonthlyUserCategoryTotal(user_id={self.user_id}, month={self.month}, type={self.type}, total={self.total})>"
+
+
+# Chave única do rollup; COALESCE porque as dimensões opcionais podem ser NULL
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+ROLLUP_KEY = [
+    MonthlyUserCategoryTotal.user_id,
+    MonthlyUserCategoryTotal.month,
+    MonthlyUserCategoryTotal.type,
+    func.coalesce(MonthlyUserCategoryTotal.category_id, text(f"'{NIL_UUID}'::uuid")),
+    func.coalesce(MonthlyUserCategoryTotal.account_id, text(f"'{NIL_UUID}'::uuid")),
+    func.coalesce(MonthlyUserCategoryTotal.credit_card_id, text(f"'{NIL_UUID}'::uuid")),
+]
+
+Index("ux_monthly_user_category_totals_key", *ROLLUP_KEY, unique=True)
@@ -2,14 +2,36 @@
 Repository de Transações e Categorias - Camada de acesso a dados.
 """
 
-from typing import List, Optional
+import uuid
+from typing import Iterator, List, Optional, Tuple
 from uuid import UUID
 from decimal import Decimal
-from datetime import date
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Date, String, func, or_, and_, tuple_, case, cast, select, insert, text, values, column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.transactions.models import Transaction, Category, TransactionType, TransactionStatus
+from app.core.dates import shift_month
+from app.transactions.models import (
+    Transaction,
+    Category,
+    TransactionType,
+    TransactionStatus,
+    MonthlyUserCategoryTotal,
+    ROLLUP_KEY,
+    NIL_UUID,
+)
+from app.accounts.models import Account, CreditCard
+from app.accounts.invoices import invoice_month_expr
+
+
+def _is_full_month_range(start_date: Optional[date], end_date: Optional[date]) -> bool:
+    """Indica se o intervalo cobre apenas meses completos (pode ser servido pelo rollup)."""
+    if start_date and start_date.day != 1:
+        return False
+    if end_date and (end_date + timedelta(days=1)).day != 1:
+        return False
+    return True
 
 
 class CategoryRepository:
@@ -123,10 +145,135 @@ class TransactionRepository:
         category_id: Optional[UUID] = None,
         limit: int = 100,
         offset: int = 0,
+        after: Optional[Tuple[date, datetime, UUID]] = None,
     ) -> List[Transaction]:
-        """Lista transações do usuário com filtros."""
-        query = self.db.query(Transaction).filter(Transaction.user_id == user_id)
+        """
+        Lista transações do usuário com filtros.
+        
+        Se `after` for informado (chave `(date, created_at, id)` da última linha
+        da página anterior), pagina por keyset e ignora o `offset`.
+        """
+        query = self._apply_filters(
+            self.db.query(Transaction)
+            .options(
+                # Nomes/cores usados em enrich_transaction vêm no mesmo SELECT (evita N+1)
+                joinedload(Transaction.account).load_only(Account.name),
+                joinedload(Transaction.credit_card).load_only(CreditCard.name),
+                joinedload(Transaction.category).load_only(Category.name, Category.color),
+            )
+            .filter(Transaction.user_id == user_id),
+            start_date, end_date, tx_type, status, account_id, credit_card_id, category_id,
+        )
+        
+        query = query.order_by(
+            Transaction.date.desc(),
+            Transaction.created_at.desc(),
+            Transaction.id.desc(),
+        )
+        
+        if after:
+            query = query.filter(
+                tuple_(Transaction.date, Transaction.created_at, Transaction.id) < tuple_(*after)
+            )
+        else:
+            query = query.offset(offset)
+        
+        return query.limit(limit).all()
+    
+    def get_listing_totals(
+        self,
+        user_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        tx_type: Optional[TransactionType] = None,
+        status: Optional[TransactionStatus] = None,
+        account_id: Optional[UUID] = None,
+        credit_card_id: Optional[UUID] = None,
+        category_id: Optional[UUID] = None,
+    ) -> dict:
+        """
+        Calcula receitas e despesas dos filtros da listagem em uma única consulta.
+        
+        Transações canceladas não entram nos totais.
+        """
+        query = self._apply_filters(
+            self.db.query(
+                func.sum(
+                    case((Transaction.type == TransactionType.INCOME, Transaction.amount))
+                ).label("income"),
+                func.sum(
+                    case((Transaction.type == TransactionType.EXPENSE, Transaction.amount))
+                ).label("expense"),
+            ).filter(
+                Transaction.user_id == user_id,
+                Transaction.status != TransactionStatus.CANCELLED,
+            ),
+            start_date, end_date, tx_type, status, account_id, credit_card_id, category_id,
+        )
         
+        row = query.one()
+        
+        return {
+            "income": row.income or Decimal("0.00"),
+            "expense": row.expense or Decimal("0.00"),
+        }
+    
+    def iter_export(
+        self,
+        user_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        tx_type: Optional[TransactionType] = None,
+        status: Optional[TransactionStatus] = None,
+        account_id: Optional[UUID] = None,
+        credit_card_id: Optional[UUID] = None,
+        category_id: Optional[UUID] = None,
+        batch_size: int = 1000,
+    ) -> Iterator:
+        """
+        Itera as transações dos filtros como linhas planas, para exportação.
+        
+        Usa cursor no servidor (`yield_per`): as linhas chegam em lotes de
+        `batch_size`, sem montar objetos do ORM nem carregar tudo em memória.
+        Ordem cronológica por `(date, created_at, id)`.
+        """
+        query = self._apply_filters(
+            self.db.query(
+                Transaction.id,
+                Transaction.date,
+                Transaction.type,
+                Transaction.status,
+                Transaction.description,
+                Transaction.amount,
+                Account.name.label("account_name"),
+                CreditCard.name.label("credit_card_name"),
+                Category.name.label("category_name"),
+                Transaction.is_recurring,
+                Transaction.notes,
+                Transaction.created_at,
+            )
+            .outerjoin(Account, Account.id == Transaction.account_id)
+            .outerjoin(CreditCard, CreditCard.id == Transaction.credit_card_id)
+            .outerjoin(Category, Category.id == Transaction.category_id)
+            .filter(Transaction.user_id == user_id),
+            start_date, end_date, tx_type, status, account_id, credit_card_id, category_id,
+        )
+        
+        query = query.order_by(Transaction.date, Transaction.created_at, Transaction.id)
+        yield from query.yield_per(batch_size)
+    
+    @staticmethod
+    def _apply_filters(
+        query,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        tx_type: Optional[TransactionType],
+        status: Optional[TransactionStatus],
+        account_id: Optional[UUID],
+        credit_card_id: Optional[UUID],
+        category_id: Optional[UUID],
+    ):
+        """Aplica os filtros opcionais da listagem de transações."""
         if start_date:
             query = query.filter(Transaction.date >= start_date)
         if end_date:
@@ -141,14 +288,7 @@ class TransactionRepository:
             query = query.filter(Transaction.credit_card_id == credit_card_id)
         if category_id:
             query = query.filter(Transaction.category_id == category_id)
-        
-        return (
-            query
-            .order_by(Transaction.date.desc(), Transaction.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-            .all()
-        )
+        return query
     
     def count_by_user(
         self,
@@ -176,7 +316,16 @@ class TransactionRepository:
         end_date: Optional[date] = None,
         account_id: Optional[UUID] = None,
     ) -> dict:
-        """Calcula totais de receitas e despesas."""
+        """
+        Calcula totais de receitas e despesas.
+        
+        Intervalos de meses completos são lidos do rollup mensal.
+        """
+        if _is_full_month_range(start_date, end_date):
+            return MonthlyRollupRepository(self.db).get_totals_by_type(
+                user_id, start_date, end_date, account_id
+            )
+        
         query = (
             self.db.query(
                 Transaction.type,
@@ -211,7 +360,16 @@ class TransactionRepository:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
     ) -> List[dict]:
-        """Calcula totais agrupados por categoria."""
+        """
+        Calcula totais agrupados por categoria.
+        
+        Intervalos de meses completos são lidos do rollup mensal.
+        """
+        if _is_full_month_range(start_date, end_date):
+            return MonthlyRollupRepository(self.db).get_totals_by_category(
+                user_id, tx_type, start_date, end_date
+            )
+        
         query = (
             self.db.query(
                 Category.id,
@@ -287,6 +445,149 @@ class TransactionRepository:
             for d, data in sorted(daily_data.items())
         ]
     
+    def get_monthly_totals(
+        self,
+        user_id: UUID,
+        start_date: date,
+        end_date: date,
+    ) -> dict:
+        """
+        Calcula receitas e despesas por mês em uma única consulta.
+        
+        Intervalos de meses completos são lidos do rollup mensal.
+        
+        Returns:
+            Dicionário `{"YYYY-MM": {"income": ..., "expense": ...}}` apenas
+            com os meses que têm transações
+        """
+        if _is_full_month_range(start_date, end_date):
+            return MonthlyRollupRepository(self.db).get_monthly_totals(
+                user_id, start_date, end_date
+            )
+        
+        month = func.date_trunc("month", Transaction.date).label("month")
+        
+        results = (
+            self.db.query(
+                month,
+                Transaction.type,
+                func.sum(Transaction.amount).label("total"),
+            )
+            .filter(
+                Transaction.user_id == user_id,
+                Transaction.date >= start_date,
+                Transaction.date <= end_date,
+                Transaction.status != TransactionStatus.CANCELLED,
+            )
+            .group_by(month, Transaction.type)
+            .all()
+        )
+        
+        monthly = {}
+        for row in results:
+            key = row.month.strftime("%Y-%m")
+            if key not in monthly:
+                monthly[key] = {"income": Decimal("0.00"), "expense": Decimal("0.00")}
+            monthly[key][row.type.value] = row.total or Decimal("0.00")
+        
+        return monthly
+    
+    def get_period_aggregates(
+        self,
+        user_id: UUID,
+        start_date: date,
+        end_date: date,
+    ) -> dict:
+        """
+        Calcula todas as agregações do período em uma única varredura.
+        
+        Usa GROUPING SETS para obter, na mesma consulta, os totais por tipo,
+        por categoria e por dia, além da quantidade de transações.
+        Transações canceladas entram na contagem, mas não nos totais.
+        
+        Returns:
+            Dicionário com `totals`, `transaction_count`, `by_category`
+            (listas por tipo, ordenadas pelo total) e `daily_flow`
+        """
+        active_total = func.sum(Transaction.amount).filter(
+            Transaction.status != TransactionStatus.CANCELLED
+        )
+        
+        results = (
+            self.db.query(
+                Transaction.type,
+                Transaction.date,
+                Category.id.label("category_id"),
+                Category.name.label("category_name"),
+                Category.color.label("category_color"),
+                active_total.label("total"),
+                func.count(Transaction.id).label("count"),
+                func.grouping(Transaction.date).label("no_date"),
+                func.grouping(Category.id).label("no_category"),
+            )
+            .outerjoin(Category, Transaction.category_id == Category.id)
+            .filter(
+                Transaction.user_id == user_id,
+                Transaction.date >= start_date,
+                Transaction.date <= end_date,
+            )
+            .group_by(
+                func.grouping_sets(
+                    tuple_(Transaction.type),
+                    tuple_(Transaction.date, Transaction.type),
+                    tuple_(Transaction.type, Category.id, Category.name, Category.color),
+                )
+            )
+            .all()
+        )
+        
+        totals = {"income": Decimal("0.00"), "expense": Decimal("0.00")}
+        by_category = {"income": [], "expense": []}
+        daily_data = {}
+        count = 0
+        
+        for row in results:
+            tx_type = row.type.value
+            
+            if row.no_date and row.no_category:
+                # Conjunto (type)
+                totals[tx_type] = row.total or Decimal("0.00")
+                count += row.count
+            elif not row.no_date:
+                # Conjunto (date, type)
+                if row.total is None:
+                    continue
+                date_str = row.date.isoformat()
+                if date_str not in daily_data:
+                    daily_data[date_str] = {"income": Decimal("0.00"), "expense": Decimal("0.00")}
+                daily_data[date_str][tx_type] = row.total
+            elif row.category_id is not None and row.total is not None:
+                # Conjunto (type, category)
+                by_category[tx_type].append({
+                    "category_id": str(row.category_id),
+                    "category_name": row.category_name,
+                    "category_color": row.category_color,
+                    "total": row.total,
+                })
+        
+        for items in by_category.values():
+            items.sort(key=lambda item: item["total"], reverse=True)
+        
+        return {
+            "totals": totals,
+            "transaction_count": count,
+            "by_category": by_category,
+            "daily_flow": [
+                {
+                    "date": d,
+                    "income": data["income"],
+                    "expense": data["expense"],
+                    "balance": data["income"] - data["expense"],
+                }
+                for d, data in sorted(daily_data.items())
+            ],
+        }
+    
     def calculate_account_balance(self, account_id: UUID) -> Decimal:
         """Calcula saldo da conta baseado nas transações."""
         income = (
@@ -311,33 +612,515 @@ class TransactionRepository:
         
         return income - expense
     
-    def calculate_card_invoice(self, card_id: UUID) -> Decimal:
-        """Calcula valor da fatura atual do cartão."""
-        total = (
-            self.db.query(func.sum(Transaction.amount))
+    def find_balance_divergences(self, user_id: Optional[UUID] = None) -> List[dict]:
+        """
+        Compara o saldo gravado de cada conta com o recalculado das transações.
+        
+        Saldo esperado = saldo inicial + receitas - despesas (sem canceladas),
+        calculado para todas as contas em uma única consulta.
+        
+        Returns:
+            Lista com as contas cujo `current_balance` diverge do esperado
+        """
+        signed = case(
+            (Transaction.type == TransactionType.INCOME, Transaction.amount),
+            else_=-Transaction.amount,
+        )
+        movement = func.coalesce(
+            func.sum(signed).filter(Transaction.status != TransactionStatus.CANCELLED),
+            0,
+        )
+        expected = (Account.initial_balance + movement).label("expected")
+        
+        query = (
+            self.db.query(
+                Account.id,
+                Account.user_id,
+                Account.name,
+                Account.current_balance,
+                expected,
+            )
+            .outerjoin(Transaction, Transaction.account_id == Account.id)
+            .group_by(Account.id)
+            .having(Account.current_balance != Account.initial_balance + movement)
+        )
+        if user_id:
+            query = query.filter(Account.user_id == user_id)
+        
+        return [
+            {
+                "account_id": row.id,
+                "user_id": row.user_id,
+                "name": row.name,
+                "current_balance": row.current_balance,
+                "expected_balance": row.expected,
+            }
+            for row in query.all()
+        ]
+    
+    def get_card_invoice_totals(
+        self,
+        user_id: UUID,
+        start_month: date,
+        end_month: date,
+        card_ids: Optional[List[UUID]] = None,
+    ) -> List[dict]:
+        """
+        Totais por cartão e ciclo de fatura, em uma única consulta agrupada.
+        
+        O ciclo de cada transação sai do `closing_day` do cartão (ver
+        `app.accounts.invoices`). Despesas somam e receitas (estornos)
+        subtraem; canceladas ficam de fora. Só retorna ciclos com lançamentos.
+        
+        Args:
+            user_id: Dono dos cartões
+            start_month: Primeiro mês de referência (dia 1)
+            end_month: Último mês de referência (dia 1)
+            card_ids: Restringe a estes cartões (padrão: todos do usuário)
+        
+        Returns:
+            Lista de dicts com credit_card_id, reference_month, total,
+            pending (despesas ainda pendentes) e count
+        """
+        reference_month = invoice_month_expr(Transaction.date, CreditCard.closing_day).label("reference_month")
+        is_expense = Transaction.type == TransactionType.EXPENSE
+        
+        query = (
+            self.db.query(
+                Transaction.credit_card_id,
+                reference_month,
+                func.sum(case((is_expense, Transaction.amount), else_=-Transaction.amount)).label("total"),
+                func.sum(case(
+                    (and_(is_expense, Transaction.status == TransactionStatus.PENDING), Transaction.amount),
+                    else_=0,
+                )).label("pending"),
+                func.count(Transaction.id).label("count"),
+            )
+            .join(CreditCard, CreditCard.id == Transaction.credit_card_id)
             .filter(
-                Transaction.credit_card_id == card_id,
-                Transaction.type == TransactionType.EXPENSE,
-                Transaction.status == TransactionStatus.PENDING
+                Transaction.user_id == user_id,
+                Transaction.status != TransactionStatus.CANCELLED,
+                # Faixa larga o bastante para qualquer dia de fechamento
+                Transaction.date >= shift_month(start_month, -1),
+                Transaction.date < shift_month(end_month, 1),
+                reference_month.between(start_month, end_month),
             )
-            .scalar()
         )
-        return total or Decimal("0.00")
+        if card_ids is not None:
+            query = query.filter(Transaction.credit_card_id.in_(card_ids))
+        
+        rows = query.group_by(Transaction.credit_card_id, reference_month).all()
+        
+        return [
+            {
+                "credit_card_id": row.credit_card_id,
+                "reference_month": row.reference_month,
+                "total": row.total or Decimal("0.00"),
+                "pending": row.pending or Decimal("0.00"),
+                "count": row.count,
+            }
+            for row in rows
+        ]
+    
+    def get_owned_references(
+        self,
+        user_id: UUID,
+        account_ids: set,
+        credit_card_ids: set,
+        category_ids: set,
+    ) -> dict:
+        """
+        Filtra os IDs de conta, cartão e categoria que o usuário pode usar.
+        
+        Categorias globais (sem usuário) também são aceitas.
+        
+        Returns:
+            Dicionário com os conjuntos `accounts`, `credit_cards` e `categories`
+        """
+        owned = {"accounts": set(), "credit_cards": set(), "categories": set()}
+        
+        if account_ids:
+            owned["accounts"] = {
+                row.id for row in self.db.query(Account.id).filter(
+                    Account.user_id == user_id,
+                    Account.id.in_(account_ids),
+                )
+            }
+        if credit_card_ids:
+            owned["credit_cards"] = {
+                row.id for row in self.db.query(CreditCard.id).filter(
+                    CreditCard.user_id == user_id,
+                    CreditCard.id.in_(credit_card_ids),
+                )
+            }
+        if category_ids:
+            owned["categories"] = {
+                row.id for row in self.db.query(Category.id).filter(
+                    or_(Category.user_id == user_id, Category.user_id == None),
+                    Category.id.in_(category_ids),
+                )
+            }
+        
+        return owned
+    
+    def find_new_fingerprints(
+        self,
+        user_id: UUID,
+        fingerprints: set,
+        created_before: datetime,
+    ) -> set:
+        """
+        Retorna, dentre as impressões digitais dadas, as que ainda não existem.
+        
+        Anti-join do lote (VALUES) contra `ix_transactions_user_fingerprint`:
+        o custo depende do tamanho do lote, não do histórico do usuário.
+        Só considera transações criadas antes de `created_before` (início da
+        importação), para que lançamentos iguais no mesmo arquivo sejam mantidos.
+        """
+        if not fingerprints:
+            return set()
+        
+        incoming = values(column("fingerprint", String), name="incoming").data(
+            [(fp,) for fp in fingerprints]
+        )
+        existing = (
+            select(Transaction.id)
+            .where(
+                Transaction.user_id == user_id,
+                Transaction.fingerprint == incoming.c.fingerprint,
+                Transaction.created_at < created_before,
+            )
+            .exists()
+        )
+        query = select(incoming.c.fingerprint).where(~existing)
+        return set(self.db.execute(query).scalars())
+    
+    def bulk_insert(self, rows: List[dict], batch_size: int = 1000) -> int:
+        """
+        Insere transações em lote (executemany), sem carregar objetos na sessão.
+        
+        Usa o INSERT da tabela (Core), que aplica os defaults das colunas sem
+        o custo do bulk do ORM. Não faz commit. Retorna a quantidade de linhas.
+        """
+        for start in range(0, len(rows), batch_size):
+            self.db.execute(insert(Transaction.__table__), rows[start:start + batch_size])
+        return len(rows)
+    
+    # Escritas sem commit: o service grava tudo em uma única unidade de
+    # trabalho (ver `app.core.database.unit_of_work`).
     
     def create(self, transaction: Transaction) -> Transaction:
-        """Cria nova transação."""
+        """Adiciona nova transação à sessão."""
         self.db.add(transaction)
-        self.db.commit()
-        self.db.refresh(transaction)
         return transaction
     
     def update(self, transaction: Transaction) -> Transaction:
-        """Atualiza transação existente."""
-        self.db.commit()
-        self.db.refresh(transaction)
+        """Atualiza transação existente (alterações já rastreadas pela sessão)."""
         return transaction
     
     def delete(self, transaction: Transaction) -> None:
-        """Remove transação do banco."""
+        """Marca transação para remoção."""
         self.db.delete(transaction)
+
+
+class MonthlyRollupRepository:
+    """
+    Repository do rollup mensal (`monthly_user_category_totals`).
+    
+    Cada transação não cancelada contribui com `(amount, 1)` para a linha da
+    sua chave `(user_id, mês, tipo, categoria, conta, cartão)`.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    @staticmethod
+    def contribution(transaction: Transaction) -> Optional[dict]:
+        """
+        Retorna a chave e o valor com que a transação contribui no rollup.
+        
+        Transações canceladas não contribuem (retorna None).
+        """
+        if transaction.status == TransactionStatus.CANCELLED:
+            return None
+        
+        return {
+            "user_id": transaction.user_id,
+            "month": transaction.date.replace(day=1),
+            "type": transaction.type,
+            "category_id": transaction.category_id,
+            "account_id": transaction.account_id,
+            "credit_card_id": transaction.credit_card_id,
+            "amount": Decimal(transaction.amount),
+        }
+    
+    def apply_change(self, old: Optional[dict], new: Optional[dict]) -> None:
+        """
+        Aplica no rollup a troca da contribuição `old` pela `new`.
+        
+        Use `old=None` na criação e `new=None` na exclusão. Não faz commit:
+        a alteração vai junto com a da transação.
+        """
+        if old and new and self._key(old) == self._key(new):
+            if new["amount"] != old["amount"]:
+                self._upsert(new, new["amount"] - old["amount"], 0)
+            return
+        
+        if old:
+            self._upsert(old, -old["amount"], -1)
+        if new:
+            self._upsert(new, new["amount"], 1)
+    
+    def apply_many(self, contributions: List[dict]) -> None:
+        """
+        Soma várias contribuições novas no rollup, um upsert por chave.
+        
+        Usado em importações em lote. Não faz commit.
+        """
+        merged = {}
+        for item in contributions:
+            key = self._key(item)
+            if key in merged:
+                merged[key][1] += item["amount"]
+                merged[key][2] += 1
+            else:
+                merged[key] = [item, item["amount"], 1]
+        
+        for item, amount, count in merged.values():
+            self._upsert(item, amount, count)
+    
+    def get_totals_by_type(
+        self,
+        user_id: UUID,
+        start_month: Optional[date] = None,
+        end_month: Optional[date] = None,
+        account_id: Optional[UUID] = None,
+    ) -> dict:
+        """Totais de receitas e despesas nos meses do intervalo."""
+        query = (
+            self.db.query(
+                MonthlyUserCategoryTotal.type,
+                func.sum(MonthlyUserCategoryTotal.total).label("total"),
+            )
+            .filter(MonthlyUserCategoryTotal.user_id == user_id)
+            .group_by(MonthlyUserCategoryTotal.type)
+        )
+        query = self._filter_months(query, start_month, end_month)
+        if account_id:
+            query = query.filter(MonthlyUserCategoryTotal.account_id == account_id)
+        
+        totals = {"income": Decimal("0.00"), "expense": Decimal("0.00")}
+        for row in query.all():
+            totals[row.type.value] = row.total or Decimal("0.00")
+        
+        return totals
+    
+    def get_totals_by_category(
+        self,
+        user_id: UUID,
+        tx_type: TransactionType,
+        start_month: Optional[date] = None,
+        end_month: Optional[date] = None,
+    ) -> List[dict]:
+        """Totais por categoria nos meses do intervalo, do maior para o menor."""
+        total = func.sum(MonthlyUserCategoryTotal.total)
+        query = (
+            self.db.query(
+                Category.id,
+                Category.name,
+                Category.color,
+                total.label("total"),
+            )
+            .join(MonthlyUserCategoryTotal, MonthlyUserCategoryTotal.category_id == Category.id)
+            .filter(
+                MonthlyUserCategoryTotal.user_id == user_id,
+                MonthlyUserCategoryTotal.type == tx_type,
+                MonthlyUserCategoryTotal.count > 0,
+            )
+            .group_by(Category.id, Category.name, Category.color)
+        )
+        query = self._filter_months(query, start_month, end_month)
+        
+        return [
+            {
+                "category_id": str(row.id),
+                "category_name": row.name,
+                "category_color": row.color,
+                "total": row.total or Decimal("0.00"),
+            }
+            for row in query.order_by(total.desc()).all()
+        ]
+    
+    def get_monthly_totals(
+        self,
+        user_id: UUID,
+        start_month: date,
+        end_month: date,
+    ) -> dict:
+        """Receitas e despesas por mês (`{"YYYY-MM": {...}}`)."""
+        query = (
+            self.db.query(
+                MonthlyUserCategoryTotal.month,
+                MonthlyUserCategoryTotal.type,
+                func.sum(MonthlyUserCategoryTotal.total).label("total"),
+            )
+            .filter(
+                MonthlyUserCategoryTotal.user_id == user_id,
+                MonthlyUserCategoryTotal.count > 0,
+            )
+            .group_by(MonthlyUserCategoryTotal.month, MonthlyUserCategoryTotal.type)
+        )
+        query = self._filter_months(query, start_month, end_month)
+        
+        monthly = {}
+        for row in query.all():
+            key = row.month.strftime("%Y-%m")
+            if key not in monthly:
+                monthly[key] = {"income": Decimal("0.00"), "expense": Decimal("0.00")}
+            monthly[key][row.type.value] = row.total or Decimal("0.00")
+        
+        return monthly
+    
+    def rebuild(self, user_id: Optional[UUID] = None) -> int:
+        """
+        Recria o rollup a partir de `transactions` (de um usuário ou de todos).
+        
+        Returns:
+            Quantidade de linhas gravadas no rollup
+        """
+        delete_query = self.db.query(MonthlyUserCategoryTotal)
+        if user_id:
+            delete_query = delete_query.filter(MonthlyUserCategoryTotal.user_id == user_id)
+        delete_query.delete(synchronize_session=False)
+        
+        source = self._raw_totals(user_id).subquery("raw")
+        result = self.db.execute(
+            insert(MonthlyUserCategoryTotal).from_select(
+                ["id", "user_id", "month", "type", "category_id", "account_id",
+                 "credit_card_id", "total", "count"],
+                select(func.gen_random_uuid(), *source.c),
+            )
+        )
         self.db.commit()
+        return result.rowcount
+    
+    def find_inconsistencies(self, user_id: Optional[UUID] = None) -> List[dict]:
+        """
+        Compara o rollup com a agregação de `transactions`.
+        
+        Returns:
+            Chaves em que total ou quantidade divergem (vazio = consistente)
+        """
+        raw = self._raw_totals(user_id).subquery("raw")
+        
+        rollup_query = select(
+            MonthlyUserCategoryTotal.user_id,
+            MonthlyUserCategoryTotal.month,
+            MonthlyUserCategoryTotal.type,
+            MonthlyUserCategoryTotal.category_id,
+            MonthlyUserCategoryTotal.account_id,
+            MonthlyUserCategoryTotal.credit_card_id,
+            MonthlyUserCategoryTotal.total,
+            MonthlyUserCategoryTotal.count,
+        ).where(MonthlyUserCategoryTotal.count != 0)
+        if user_id:
+            rollup_query = rollup_query.where(MonthlyUserCategoryTotal.user_id == user_id)
+        rollup = rollup_query.subquery("rollup")
+        
+        key = ["user_id", "month", "type", "category_id", "account_id", "credit_card_id"]
+        nil = text(f"'{NIL_UUID}'::uuid")
+        # FULL JOIN exige condição de igualdade (hash/merge join): COALESCE nas colunas opcionais
+        on = and_(
+            raw.c.user_id == rollup.c.user_id,
+            raw.c.month == rollup.c.month,
+            raw.c.type == rollup.c.type,
+            *[func.coalesce(raw.c[k], nil) == func.coalesce(rollup.c[k], nil) for k in key[3:]],
+        )
+        
+        query = (
+            select(
+                *[func.coalesce(raw.c[k], rollup.c[k]).label(k) for k in key],
+                raw.c.total.label("expected_total"),
+                rollup.c.total.label("rollup_total"),
+                raw.c.count.label("expected_count"),
+                rollup.c.count.label("rollup_count"),
+            )
+            .select_from(raw.join(rollup, on, full=True))
+            .where(or_(
+                raw.c.total.is_distinct_from(rollup.c.total),
+                raw.c.count.is_distinct_from(rollup.c.count),
+            ))
+        )
+        
+        return [dict(row._mapping) for row in self.db.execute(query)]
+    
+    @staticmethod
+    def _raw_totals(user_id: Optional[UUID] = None):
+        """SELECT que agrega `transactions` na granularidade do rollup."""
+        month = cast(func.date_trunc("month", Transaction.date), Date)
+        query = (
+            select(
+                Transaction.user_id,
+                month.label("month"),
+                Transaction.type,
+                Transaction.category_id,
+                Transaction.account_id,
+                Transaction.credit_card_id,
+                func.sum(Transaction.amount).label("total"),
+                func.count(Transaction.id).label("count"),
+            )
+            .where(Transaction.status != TransactionStatus.CANCELLED)
+            .group_by(
+                Transaction.user_id,
+                month,
+                Transaction.type,
+                Transaction.category_id,
+                Transaction.account_id,
+                Transaction.credit_card_id,
+            )
+        )
+        if user_id:
+            query = query.where(Transaction.user_id == user_id)
+        return query
+    
+    @staticmethod
+    def _filter_months(query, start_month: Optional[date], end_month: Optional[date]):
+        """Restringe aos meses que começam dentro do intervalo."""
+        if start_month:
+            query = query.filter(MonthlyUserCategoryTotal.month >= start_month)
+        if end_month:
+            query = query.filter(MonthlyUserCategoryTotal.month <= end_month)
+        return query
+    
+    @staticmethod
+    def _key(contribution: dict) -> tuple:
+        return (
+            contribution["user_id"],
+            contribution["month"],
+            contribution["type"],
+            contribution["category_id"],
+            contribution["account_id"],
+            contribution["credit_card_id"],
+        )
+    
+    def _upsert(self, contribution: dict, amount: Decimal, count: int) -> None:
+        """Soma `amount` e `count` na linha da chave (criando se necessário)."""
+        stmt = pg_insert(MonthlyUserCategoryTotal).values(
+            id=uuid.uuid4(),
+            user_id=contribution["user_id"],
+            month=contribution["month"],
+            type=contribution["type"],
+            category_id=contribution["category_id"],
+            account_id=contribution["account_id"],
+            credit_card_id=contribution["credit_card_id"],
+            total=amount,
+            count=count,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=ROLLUP_KEY,
+            set_={
+                "total": MonthlyUserCategoryTotal.total + stmt.excluded.total,
+                "count": MonthlyUserCategoryTotal.count + stmt.excluded.count,
+            },
+        )
+        self.db.execute(stmt)
@@ -3,12 +3,18 @@ Router de Transações e Categorias.
 Define endpoints CRUD para lançamentos financeiros.
 """
 
-from typing import List, Optional
+import json
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
 from datetime import date
-from fastapi import APIRouter, Query, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
-from app.core.dependencies import CurrentUser, DatabaseSession
+from app.core.cache import user_cache
+from app.core.config import settings
+from app.core.dependencies import CurrentUser, DatabaseSession, ReadSession, ETagCheck
+from app.transactions.export import MEDIA_TYPES, check_format, export_transactions
 from app.transactions.models import TransactionType, TransactionStatus
 from app.transactions.service import TransactionService, CategoryService
 from app.transactions.schemas import (
@@ -16,6 +22,7 @@ from app.transactions.schemas import (
     TransactionUpdate,
     TransactionResponse,
     TransactionListResponse,
+    TransactionBulkResponse,
     TransactionSummary,
     CashFlowResponse,
     CategoryCreate,
@@ -24,8 +31,9 @@ from app.transactions.schemas import (
 
 
 # Routers
+# ETag por rota nas leituras JSON: a exportação (StreamingResponse) não leva tag
 transactions_router = APIRouter(prefix="/transactions", tags=["Transações"])
-categories_router = APIRouter(prefix="/categories", tags=["Categorias"])
+categories_router = APIRouter(prefix="/categories", tags=["Categorias"], dependencies=[ETagCheck])
 
 
 # ===========================================
@@ -37,8 +45,9 @@ categories_router = APIRouter(prefix="/categories", tags=["Categorias"])
     response_model=TransactionListResponse,
     summary="Listar transações",
     description="Lista transações do usuário com filtros opcionais.",
+    dependencies=[ETagCheck],
 )
-async def list_transactions(
+def list_transactions(
     current_user: CurrentUser,
     db: DatabaseSession,
     start_date: Optional[date] = Query(None, description="Data inicial"),
@@ -50,6 +59,11 @@ async def list_transactions(
     category_id: Optional[UUID] = Query(None, description="Filtrar por categoria"),
     limit: int = Query(100, ge=1, le=500, description="Limite de resultados"),
     offset: int = Query(0, ge=0, description="Offset para paginação"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (substitui o offset)"),
+    include_totals: Optional[bool] = Query(
+        None,
+        description="Calcular totais dos filtros (padrão: só na primeira página do modo cursor)",
+    ),
 ):
     """
     Lista transações com diversos filtros.
@@ -59,10 +73,15 @@ async def list_transactions(
     - Por período: GET /transactions?start_date=2024-01-01&end_date=2024-01-31
     - Só receitas: GET /transactions?type=income
     - De uma conta: GET /transactions?account_id=uuid
+    - Próxima página: GET /transactions?cursor=<next_cursor da resposta anterior>
+    
+    Os totais (receitas, despesas e saldo) seguem os mesmos filtros da listagem.
+    Páginas pedidas com `cursor` não recalculam os totais, que não mudam entre
+    páginas; use `include_totals=true` para forçar.
     """
     service = TransactionService(db)
     
-    transactions = service.get_all(
+    transactions, next_cursor = service.get_page(
         user_id=current_user.id,
         start_date=start_date,
         end_date=end_date,
@@ -73,10 +92,25 @@ async def list_transactions(
         category_id=category_id,
         limit=limit,
         offset=offset,
+        cursor=cursor,
     )
     
-    # Calcular totais
-    summary = service.get_summary(current_user.id, start_date, end_date)
+    # Calcular totais (uma única agregação, só quando necessário)
+    if include_totals is None:
+        include_totals = cursor is None
+    
+    totals = {}
+    if include_totals:
+        totals = service.get_listing_totals(
+            user_id=current_user.id,
+            start_date=start_date,
+            end_date=end_date,
+            tx_type=type,
+            status=status,
+            account_id=account_id,
+            credit_card_id=credit_card_id,
+            category_id=category_id,
+        )
     
     # Enriquecer transações
     enriched = [service.enrich_transaction(t) for t in transactions]
@@ -84,9 +118,52 @@ async def list_transactions(
     return TransactionListResponse(
         transactions=[TransactionResponse(**t) for t in enriched],
         total=len(transactions),
-        total_income=summary.total_income,
-        total_expense=summary.total_expense,
-        balance=summary.balance,
+        next_cursor=next_cursor,
+        **totals,
+    )
+
+
+@transactions_router.get(
+    "/export",
+    summary="Exportar transações",
+    description="Exporta o histórico em CSV, NDJSON ou Parquet, em streaming.",
+    response_class=StreamingResponse,
+)
+def export_transactions_file(
+    current_user: CurrentUser,
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$", description="csv, ndjson ou parquet"),
+    start_date: Optional[date] = Query(None, description="Data inicial"),
+    end_date: Optional[date] = Query(None, description="Data final"),
+    type: Optional[TransactionType] = Query(None, description="Tipo: income ou expense"),
+    status: Optional[TransactionStatus] = Query(None, description="Status"),
+    account_id: Optional[UUID] = Query(None, description="Filtrar por conta"),
+    credit_card_id: Optional[UUID] = Query(None, description="Filtrar por cartão"),
+    category_id: Optional[UUID] = Query(None, description="Filtrar por categoria"),
+):
+    """
+    Exporta todas as transações dos filtros, sem limite de linhas.
+    
+    Aceita os mesmos filtros da listagem. As linhas são lidas do banco por
+    cursor e enviadas em blocos, em ordem cronológica; o download começa
+    antes da consulta terminar. Parquet requer o pacote `pyarrow`.
+    """
+    check_format(format)
+    
+    content = export_transactions(
+        current_user.id,
+        format,
+        start_date=start_date,
+        end_date=end_date,
+        tx_type=type,
+        status=status,
+        account_id=account_id,
+        credit_card_id=credit_card_id,
+        category_id=category_id,
+    )
+    return StreamingResponse(
+        content,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transacoes.{format}"'},
     )
 
 
@@ -97,7 +174,7 @@ async def list_transactions(
     summary="Criar transação",
     description="Cria uma nova transação (receita ou despesa).",
 )
-async def create_transaction(
+def create_transaction(
     data: TransactionCreate,
     current_user: CurrentUser,
     db: DatabaseSession,
@@ -117,15 +194,100 @@ async def create_transaction(
     return TransactionResponse(**enriched)
 
 
+@transactions_router.post(
+    "/bulk",
+    response_model=TransactionBulkResponse,
+    summary="Importar transações em lote",
+    description="Cria várias transações em uma chamada (array JSON ou NDJSON).",
+)
+async def bulk_create_transactions(
+    request: Request,
+    current_user: CurrentUser,
+    db: DatabaseSession,
+):
+    """
+    Importa um lote de lançamentos (ex: migração de histórico).
+    
+    O corpo pode ser um array JSON de transações ou, com
+    `Content-Type: application/x-ndjson`, uma transação JSON por linha.
+    Cada item segue o formato de `POST /transactions`.
+    
+    Itens inválidos não interrompem o lote: são devolvidos em `errors`
+    com sua posição (`index`) e os demais são gravados.
+    """
+    parse_errors = []
+    if "ndjson" in request.headers.get("content-type", ""):
+        items = await _read_ndjson(request, parse_errors)
+    else:
+        try:
+            payload = json.loads(await request.body())
+        except ValueError:
+            payload = None
+        if not isinstance(payload, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Corpo deve ser um array JSON de transações"
+            )
+        items = list(enumerate(payload))
+        _check_bulk_size(len(items))
+    
+    # Leitura do corpo é assíncrona; a gravação (síncrona) vai para o threadpool
+    service = TransactionService(db)
+    result = await run_in_threadpool(service.bulk_create, current_user.id, items)
+    
+    errors = sorted(parse_errors + result["errors"], key=lambda e: e["index"])
+    return TransactionBulkResponse(
+        received=len(items) + len(parse_errors),
+        created=result["created"],
+        errors=errors,
+    )
+
+
+async def _read_ndjson(request: Request, errors: List[dict]) -> List[Tuple[int, Any]]:
+    """Lê o corpo NDJSON em streaming, linha a linha; linhas inválidas vão para `errors`."""
+    items = []
+    index = 0
+    buffer = b""
+    
+    def parse(line: bytes) -> None:
+        nonlocal index
+        if not line.strip():
+            return
+        try:
+            items.append((index, json.loads(line)))
+        except ValueError:
+            errors.append({"index": index, "detail": "JSON inválido"})
+        index += 1
+        _check_bulk_size(index)
+    
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            parse(line)
+    parse(buffer)
+    
+    return items
+
+
+def _check_bulk_size(count: int) -> None:
+    if count > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote excede o limite de {settings.bulk_max_items} transações"
+        )
+
+
 @transactions_router.get(
     "/summary",
     response_model=TransactionSummary,
     summary="Resumo de transações",
     description="Retorna resumo com totais e distribuição por categoria.",
+    dependencies=[ETagCheck],
 )
-async def get_summary(
+def get_summary(
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: ReadSession,
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
 ):
@@ -138,7 +300,10 @@ async def get_summary(
     - Distribuição por categoria
     """
     service = TransactionService(db)
-    return service.get_summary(current_user.id, start_date, end_date)
+    return user_cache.get_or_set(
+        current_user.id, "transactions.summary", {"start_date": start_date, "end_date": end_date},
+        lambda: service.get_summary(current_user.id, start_date, end_date),
+    )
 
 
 @transactions_router.get(
@@ -146,10 +311,11 @@ async def get_summary(
     response_model=CashFlowResponse,
     summary="Fluxo de caixa",
     description="Retorna fluxo de caixa diário do período.",
+    dependencies=[ETagCheck],
 )
-async def get_cash_flow(
+def get_cash_flow(
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: ReadSession,
     start_date: date = Query(..., description="Data inicial"),
     end_date: date = Query(..., description="Data final"),
 ):
@@ -168,8 +334,9 @@ async def get_cash_flow(
     response_model=TransactionResponse,
     summary="Detalhe da transação",
     description="Retorna detalhes de uma transação específica.",
+    dependencies=[ETagCheck],
 )
-async def get_transaction(
+def get_transaction(
     transaction_id: UUID,
     current_user: CurrentUser,
     db: DatabaseSession,
@@ -188,7 +355,7 @@ async def get_transaction(
     summary="Atualizar transação",
     description="Atualiza uma transação existente.",
 )
-async def update_transaction(
+def update_transaction(
     transaction_id: UUID,
     data: TransactionUpdate,
     current_user: CurrentUser,
@@ -208,7 +375,7 @@ async def update_transaction(
     summary="Excluir transação",
     description="Remove uma transação do sistema.",
 )
-async def delete_transaction(
+def delete_transaction(
     transaction_id: UUID,
     current_user: CurrentUser,
     db: DatabaseSession,
@@ -228,7 +395,7 @@ async def delete_transaction(
     summary="Listar categorias",
     description="Lista categorias disponíveis (globais + personalizadas).",
 )
-async def list_categories(
+def list_categories(
     current_user: CurrentUser,
     db: DatabaseSession,
     type: Optional[TransactionType] = Query(None, description="Filtrar por tipo"),
@@ -258,7 +425,7 @@ async def list_categories(
     summary="Criar categoria",
     description="Cria uma nova categoria personalizada.",
 )
-async def create_category(
+def create_category(
     data: CategoryCreate,
     current_user: CurrentUser,
     db: DatabaseSession,
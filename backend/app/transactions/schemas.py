@@ -2,6 +2,7 @@
 Schemas Pydantic para Transações e Categorias.
 """
 
+import datetime as dt
 from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional, List
@@ -53,7 +54,7 @@ class TransactionBase(BaseModel):
     type: TransactionType = Field(..., description="Tipo: income ou expense")
     description: str = Field(..., min_length=1, max_length=255, description="Descrição")
     amount: Decimal = Field(..., gt=0, description="Valor (sempre positivo)")
-    date: date = Field(..., description="Data do lançamento")
+    date: dt.date = Field(..., description="Data do lançamento")
     status: TransactionStatus = Field(
         default=TransactionStatus.PAID,
         description="Status: pending, paid, cancelled"
@@ -87,7 +88,7 @@ class TransactionUpdate(BaseModel):
     
     description: Optional[str] = Field(None, min_length=1, max_length=255)
     amount: Optional[Decimal] = Field(None, gt=0)
-    date: Optional[date] = None
+    date: Optional[dt.date] = None
     status: Optional[TransactionStatus] = None
     category_id: Optional[UUID] = None
     notes: Optional[str] = None
@@ -106,7 +107,7 @@ class TransactionResponse(BaseModel):
     type: TransactionType
     description: str
     amount: Decimal
-    date: date
+    date: dt.date
     status: TransactionStatus
     is_recurring: bool
     recurring_id: Optional[UUID] = None
@@ -138,9 +139,27 @@ class TransactionListResponse(BaseModel):
     
     transactions: List[TransactionResponse]
     total: int
-    total_income: Decimal
-    total_expense: Decimal
-    balance: Decimal
+    
+    # Totais dos filtros (None quando a página foi pedida sem totais)
+    total_income: Optional[Decimal] = None
+    total_expense: Optional[Decimal] = None
+    balance: Optional[Decimal] = None
+    next_cursor: Optional[str] = None  # Cursor da próxima página (None = última)
+
+
+class TransactionBulkError(BaseModel):
+    """Erro de um item da importação em lote."""
+    
+    index: int  # Posição do item no lote (a partir de 0)
+    detail: str
+
+
+class TransactionBulkResponse(BaseModel):
+    """Resultado da importação em lote."""
+    
+    received: int
+    created: int
+    errors: List[TransactionBulkError] = []
 
 
 class TransactionSummary(BaseModel):
@@ -163,7 +182,7 @@ class TransactionSummary(BaseModel):
 class DailyCashFlow(BaseModel):
     """Fluxo de caixa diário."""
     
-    date: date
+    date: dt.date
     income: Decimal
     expense: Decimal
     balance: Decimal
@@ -2,15 +2,27 @@
 Service de Transações e Categorias - Regras de negócio.
 """
 
-from typing import List, Optional
+from typing import Any, Iterable, List, Optional, Tuple
 from uuid import UUID
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
+from types import SimpleNamespace
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 
-from app.transactions.models import Transaction, Category, TransactionType, TransactionStatus
-from app.transactions.repository import TransactionRepository, CategoryRepository
+from app.core.cache import invalidate_user
+from app.core.database import unit_of_work
+from app.core.pagination import encode_cursor, decode_cursor
+
+from app.transactions.models import (
+    Transaction,
+    Category,
+    TransactionType,
+    TransactionStatus,
+    transaction_fingerprint,
+)
+from app.transactions.repository import TransactionRepository, CategoryRepository, MonthlyRollupRepository
 from app.transactions.schemas import (
     TransactionCreate,
     TransactionUpdate,
@@ -20,6 +32,16 @@ from app.transactions.schemas import (
 from app.accounts.service import AccountService
 
 
+# Colunas opcionais ao calcular saldo/rollup de linhas inseridas em lote
+_ROW_DEFAULTS = {
+    "account_id": None,
+    "credit_card_id": None,
+    "category_id": None,
+    "status": TransactionStatus.PAID,
+    "fingerprint": None,
+}
+
+
 class CategoryService:
     """Service com regras de negócio de Categorias."""
     
@@ -44,7 +66,9 @@ class CategoryService:
             icon=data.icon,
             color=data.color,
         )
-        return self.repository.create(category)
+        category = self.repository.create(category)
+        invalidate_user(user_id)
+        return category
     
     def ensure_default_categories_exist(self) -> None:
         """Garante que categorias padrão existam."""
@@ -59,12 +83,14 @@ class TransactionService:
     def __init__(self, db: Session):
         self.db = db
         self.repository = TransactionRepository(db)
+        self.rollup = MonthlyRollupRepository(db)
     
     def create(self, user_id: UUID, data: TransactionCreate) -> Transaction:
         """
         Cria nova transação.
         
-        Após criar, recalcula o saldo da conta (se aplicável).
+        O saldo da conta e o rollup mensal são ajustados pela diferença,
+        no mesmo commit da transação (um único commit por chamada).
         """
         transaction = Transaction(
             user_id=user_id,
@@ -79,14 +105,14 @@ class TransactionService:
             is_recurring=data.is_recurring,
             notes=data.notes,
         )
+        transaction.fingerprint = self._fingerprint(transaction)
         
-        transaction = self.repository.create(transaction)
-        
-        # Recalcular saldo da conta
-        if transaction.account_id:
-            account_service = AccountService(self.db)
-            account_service.recalculate_balance(transaction.account_id)
+        # Saldo e rollup mensal vão no mesmo commit da transação
+        with unit_of_work(self.db):
+            self._apply_side_effects(None, transaction)
+            self.repository.create(transaction)
         
+        invalidate_user(user_id)
         return transaction
     
     def get_by_id(self, transaction_id: UUID, user_id: UUID) -> Transaction:
@@ -128,44 +154,264 @@ class TransactionService:
             offset=offset,
         )
     
+    def get_page(
+        self,
+        user_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        tx_type: Optional[TransactionType] = None,
+        status: Optional[TransactionStatus] = None,
+        account_id: Optional[UUID] = None,
+        credit_card_id: Optional[UUID] = None,
+        category_id: Optional[UUID] = None,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """
+        Lista uma página de transações e o cursor da próxima página.
+        
+        Com `cursor`, pagina por keyset em `(date, created_at, id)` e o custo
+        independe da profundidade da página. Sem ele, mantém o modo `offset`.
+        
+        Returns:
+            Tupla com (transações, próximo cursor ou None se for a última página)
+        """
+        after = self._decode_cursor(cursor) if cursor else None
+        
+        transactions = self.repository.get_all_by_user(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            tx_type=tx_type,
+            status=status,
+            account_id=account_id,
+            credit_card_id=credit_card_id,
+            category_id=category_id,
+            limit=limit + 1,  # Uma linha extra indica se há próxima página
+            offset=offset,
+            after=after,
+        )
+        
+        next_cursor = None
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            last = transactions[-1]
+            next_cursor = encode_cursor([
+                last.date.isoformat(),
+                last.created_at.isoformat(),
+                last.id,
+            ])
+        
+        return transactions, next_cursor
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[date, datetime, UUID]:
+        """Converte o cursor opaco na chave `(date, created_at, id)`."""
+        tx_date, created_at, tx_id = decode_cursor(cursor, size=3)
+        try:
+            return (
+                date.fromisoformat(tx_date),
+                datetime.fromisoformat(created_at),
+                UUID(tx_id),
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginação inválido"
+            )
+    
     def update(self, transaction_id: UUID, user_id: UUID, data: TransactionUpdate) -> Transaction:
         """Atualiza transação existente."""
         transaction = self.get_by_id(transaction_id, user_id)
-        old_account_id = transaction.account_id
-        
-        if data.description is not None:
-            transaction.description = data.description
-        if data.amount is not None:
-            transaction.amount = data.amount
-        if data.date is not None:
-            transaction.date = data.date
-        if data.status is not None:
-            transaction.status = data.status
-        if data.category_id is not None:
-            transaction.category_id = data.category_id
-        if data.notes is not None:
-            transaction.notes = data.notes
-        
-        transaction = self.repository.update(transaction)
-        
-        # Recalcular saldo da conta
-        if old_account_id:
-            account_service = AccountService(self.db)
-            account_service.recalculate_balance(old_account_id)
+        old_effects = self._effects(transaction)
+        
+        with unit_of_work(self.db):
+            if data.description is not None:
+                transaction.description = data.description
+            if data.amount is not None:
+                transaction.amount = data.amount
+            if data.date is not None:
+                transaction.date = data.date
+            if data.status is not None:
+                transaction.status = data.status
+            if data.category_id is not None:
+                transaction.category_id = data.category_id
+            if data.notes is not None:
+                transaction.notes = data.notes
+            transaction.fingerprint = self._fingerprint(transaction)
+            
+            self._apply_side_effects(old_effects, transaction)
+            self.repository.update(transaction)
         
+        invalidate_user(user_id)
         return transaction
     
     def delete(self, transaction_id: UUID, user_id: UUID) -> None:
         """Remove transação."""
         transaction = self.get_by_id(transaction_id, user_id)
-        account_id = transaction.account_id
         
-        self.repository.delete(transaction)
+        with unit_of_work(self.db):
+            self._apply_side_effects(self._effects(transaction), None)
+            self.repository.delete(transaction)
+        
+        invalidate_user(user_id)
+    
+    def bulk_create(self, user_id: UUID, items: Iterable[Tuple[int, Any]]) -> dict:
+        """
+        Cria transações em lote, com erros por item.
+        
+        Os itens são validados em lote (schema e posse de conta, cartão e
+        categoria); os inválidos são reportados e os demais são inseridos
+        com executemany. Saldos e rollup são ajustados uma vez por conta/chave,
+        tudo em um único commit.
+        
+        Args:
+            items: Pares `(posição no lote, item bruto)`
+        
+        Returns:
+            Dicionário com `created` e `errors` (lista de `{index, detail}`)
+        """
+        errors = []
+        valid = []
+        for index, raw in items:
+            try:
+                valid.append((index, TransactionCreate.model_validate(raw)))
+            except ValidationError as e:
+                errors.append({"index": index, "detail": self._format_validation_error(e)})
+        
+        owned = self.repository.get_owned_references(
+            user_id,
+            account_ids={d.account_id for _, d in valid if d.account_id},
+            credit_card_ids={d.credit_card_id for _, d in valid if d.credit_card_id},
+            category_ids={d.category_id for _, d in valid if d.category_id},
+        )
+        
+        rows = []
+        for index, data in valid:
+            if data.account_id and data.account_id not in owned["accounts"]:
+                errors.append({"index": index, "detail": "Conta não encontrada"})
+                continue
+            if data.credit_card_id and data.credit_card_id not in owned["credit_cards"]:
+                errors.append({"index": index, "detail": "Cartão não encontrado"})
+                continue
+            if data.category_id and data.category_id not in owned["categories"]:
+                errors.append({"index": index, "detail": "Categoria não encontrada"})
+                continue
+            
+            rows.append({"user_id": user_id, **data.model_dump()})
+        
+        created = self.insert_many(rows)
+        
+        errors.sort(key=lambda e: e["index"])
+        return {"created": created, "errors": errors}
+    
+    def insert_many(self, rows: List[dict]) -> int:
+        """
+        Insere linhas de transação já validadas em um único commit.
+        
+        Saldos recebem um UPDATE por conta e o rollup um upsert por chave,
+        em vez de um ajuste por transação.
+        
+        Returns:
+            Quantidade de transações inseridas
+        """
+        if not rows:
+            return 0
+        
+        deltas = {}
+        contributions = []
+        for row in rows:
+            # Visão leve da linha: instanciar o model custa mais que o INSERT
+            transaction = SimpleNamespace(**{**_ROW_DEFAULTS, **row})
+            if not row.get("fingerprint"):
+                row["fingerprint"] = self._fingerprint(transaction)
+            
+            effect = AccountService.balance_effect(transaction)
+            if effect:
+                deltas[effect[0]] = deltas.get(effect[0], Decimal("0.00")) + effect[1]
+            contribution = MonthlyRollupRepository.contribution(transaction)
+            if contribution:
+                contributions.append(contribution)
+        
+        with unit_of_work(self.db):
+            self.repository.bulk_insert(rows)
+            AccountService(self.db).apply_balance_deltas(deltas)
+            self.rollup.apply_many(contributions)
+        
+        for user_id in {row["user_id"] for row in rows}:
+            invalidate_user(user_id)
+        return len(rows)
+    
+    @staticmethod
+    def _fingerprint(transaction) -> str:
+        """Impressão digital da transação (ver `transaction_fingerprint`)."""
+        return transaction_fingerprint(
+            transaction.account_id,
+            transaction.credit_card_id,
+            transaction.date,
+            transaction.amount,
+            transaction.description,
+        )
+    
+    @staticmethod
+    def _format_validation_error(error: ValidationError) -> str:
+        """Resume um erro de validação do Pydantic em uma linha."""
+        messages = []
+        for item in error.errors():
+            field = ".".join(str(part) for part in item["loc"])
+            messages.append(f"{field}: {item['msg']}" if field else item["msg"])
+        return "; ".join(messages)
+    
+    @staticmethod
+    def _effects(transaction: Transaction) -> dict:
+        """Captura o efeito da transação no saldo da conta e no rollup mensal."""
+        return {
+            "balance": AccountService.balance_effect(transaction),
+            "rollup": MonthlyRollupRepository.contribution(transaction),
+        }
+    
+    def _apply_side_effects(self, old: Optional[dict], transaction: Optional[Transaction]) -> None:
+        """
+        Aplica a troca do efeito `old` pelo efeito atual da transação.
+        
+        Use `old=None` na criação e `transaction=None` na exclusão. Nada é
+        commitado aqui: o commit da própria transação grava tudo junto.
+        """
+        new = self._effects(transaction) if transaction is not None else {}
+        old = old or {}
         
-        # Recalcular saldo da conta
-        if account_id:
-            account_service = AccountService(self.db)
-            account_service.recalculate_balance(account_id)
+        AccountService(self.db).apply_balance_change(old.get("balance"), new.get("balance"))
+        self.rollup.apply_change(old.get("rollup"), new.get("rollup"))
+    
+    def get_listing_totals(
+        self,
+        user_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        tx_type: Optional[TransactionType] = None,
+        status: Optional[TransactionStatus] = None,
+        account_id: Optional[UUID] = None,
+        credit_card_id: Optional[UUID] = None,
+        category_id: Optional[UUID] = None,
+    ) -> dict:
+        """Retorna receitas, despesas e saldo para os filtros da listagem."""
+        totals = self.repository.get_listing_totals(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            tx_type=tx_type,
+            status=status,
+            account_id=account_id,
+            credit_card_id=credit_card_id,
+            category_id=category_id,
+        )
+        
+        return {
+            "total_income": totals["income"],
+            "total_expense": totals["expense"],
+            "balance": totals["income"] - totals["expense"],
+        }
     
     def get_summary(
         self,
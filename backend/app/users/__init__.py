@@ -12,7 +12,6 @@ from app.users.schemas import (
 )
 from app.users.repository import UserRepository
 from app.users.service import UserService
-from app.users.router import auth_router, users_router
 
 __all__ = [
     "User",
@@ -23,6 +22,4 @@ __all__ = [
     "TokenResponse",
     "UserRepository",
     "UserService",
-    "auth_router",
-    "users_router",
 ]
@@ -40,7 +40,7 @@ users_router = APIRouter(prefix="/users", tags=["Usuários"])
     summary="Cadastrar novo usuário",
     description="Cria uma nova conta de usuário no sistema.",
 )
-async def register(
+def register(
     data: UserCreate,
     db: DatabaseSession,
 ):
@@ -63,7 +63,7 @@ async def register(
     summary="Fazer login",
     description="Autentica o usuário e retorna um token JWT.",
 )
-async def login(
+def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: DatabaseSession,
 ):
@@ -88,7 +88,7 @@ async def login(
     summary="Fazer login (JSON)",
     description="Autentica o usuário via JSON e retorna um token JWT.",
 )
-async def login_json(
+def login_json(
     data: LoginRequest,
     db: DatabaseSession,
 ):
@@ -112,7 +112,7 @@ async def login_json(
     summary="Dados do usuário logado",
     description="Retorna os dados do usuário autenticado.",
 )
-async def get_current_user_data(
+def get_current_user_data(
     current_user: CurrentUser,
 ):
     """
@@ -133,7 +133,7 @@ async def get_current_user_data(
     summary="Atualizar perfil",
     description="Atualiza os dados do perfil do usuário logado.",
 )
-async def update_profile(
+def update_profile(
     data: UserUpdate,
     current_user: CurrentUser,
     db: DatabaseSession,
@@ -153,7 +153,7 @@ async def update_profile(
     summary="Alterar senha",
     description="Altera a senha do usuário logado.",
 )
-async def update_password(
+def update_password(
     data: UserPasswordUpdate,
     current_user: CurrentUser,
     db: DatabaseSession,
@@ -167,3 +167,23 @@ async def update_password(
     user = service.update_password(current_user, data)
     
     return UserResponse.model_validate(user)
+
+
+@users_router.delete(
+    "/me",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Desativar conta",
+    description="Desativa a conta do usuário logado.",
+)
+def deactivate_account(
+    current_user: CurrentUser,
+    db: DatabaseSession,
+):
+    """
+    Desativa a conta (os dados são mantidos).
+    
+    O login deixa de ser aceito e os tokens já emitidos são recusados a
+    partir da próxima requisição.
+    """
+    service = UserService(db)
+    service.deactivate(current_user)
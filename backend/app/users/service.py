@@ -10,7 +10,13 @@ from fastapi import HTTPException, status
 from app.users.models import User
 from app.users.repository import UserRepository
 from app.users.schemas import UserCreate, UserUpdate, UserPasswordUpdate
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.cache import invalidate_identity
+from app.core.security import (
+    get_password_hash,
+    verify_password,
+    verify_and_update_password,
+    create_access_token,
+)
 
 
 class UserService:
@@ -57,6 +63,9 @@ class UserService:
         """
         Autentica usuário por email e senha.
         
+        Se o hash foi gerado com outro custo (BCRYPT_ROUNDS), é refeito
+        com a senha informada e salvo.
+        
         Args:
             email: Email do usuário
             password: Senha em texto plano
@@ -69,12 +78,17 @@ class UserService:
         if not user:
             return None
         
-        if not verify_password(password, user.password_hash):
+        valid, new_hash = verify_and_update_password(password, user.password_hash)
+        if not valid:
             return None
         
         if not user.is_active:
             return None
         
+        if new_hash:
+            user.password_hash = new_hash
+            user = self.repository.update(user)
+        
         return user
     
     def login(self, email: str, password: str) -> tuple[User, str]:
@@ -128,7 +142,9 @@ class UserService:
         if data.avatar_url is not None:
             user.avatar_url = data.avatar_url
         
-        return self.repository.update(user)
+        user = self.repository.update(user)
+        invalidate_identity(user.id)
+        return user
     
     def update_password(self, user: User, data: UserPasswordUpdate) -> User:
         """
@@ -151,4 +167,18 @@ class UserService:
             )
         
         user.password_hash = get_password_hash(data.new_password)
-        return self.repository.update(user)
+        user = self.repository.update(user)
+        invalidate_identity(user.id)
+        return user
+    
+    def deactivate(self, user: User) -> User:
+        """
+        Desativa o usuário.
+        
+        Tokens já emitidos deixam de ser aceitos na próxima requisição
+        (o usuário em cache é descartado).
+        """
+        user.is_active = False
+        user = self.repository.update(user)
+        invalidate_identity(user.id)
+        return user
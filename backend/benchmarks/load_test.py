@@ -0,0 +1,137 @@
+"""
+Teste de carga: vazão e latência da API sob concorrência crescente.
+
+Dispara requisições autenticadas contra um servidor já em execução e, em
+paralelo, mede a latência de `/api/health` (que não usa o banco). Se o event
+loop estiver bloqueado por consultas síncronas, o health check fica tão lento
+quanto as consultas; com as rotas no threadpool, ele continua respondendo.
+
+Uso (rode o servidor com CACHE_ENABLED=false para as agregações executarem):
+
+    uvicorn app.main:app --port 8000
+    python benchmarks/load_test.py --email voce@exemplo.com --password ... \\
+        --path "/api/dashboard?start_date=2024-01-01&end_date=2024-12-31" \\
+        --concurrency 1,4,16,32 --requests 200
+
+Para comparar com outra versão, rode o mesmo comando contra cada uma.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List, Optional
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/api/auth/login/json", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+async def run_level(client: httpx.AsyncClient, request: Request, concurrency: int, total: int) -> dict:
+    """
+    Executa `total` requisições com `concurrency` clientes simultâneos.
+
+    `request` faz uma requisição do cenário (ex: um GET autenticado, um login);
+    em paralelo, `/api/health` é medido a cada 50 ms.
+    """
+    latencies: List[float] = []
+    probes: List[float] = []
+    errors = 0
+    remaining = total
+    done = asyncio.Event()
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await request(client)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/api/health")
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(0.05)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    return {
+        "concurrency": concurrency,
+        "rps": len(latencies) / elapsed,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "health_p95": _percentile(probes, 95),
+        "errors": errors,
+    }
+
+
+def _percentile(values: List[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1]
+
+
+def print_header(rate_label: str = "req/s") -> None:
+    print(f"{'conc':>5} {rate_label:>8} {'p50 ms':>8} {'p95 ms':>8} {'health p95 ms':>14} {'erros':>6}")
+
+
+def print_level(r: dict) -> None:
+    print(
+        f"{r['concurrency']:>5} {r['rps']:>8.1f} {r['p50'] * 1000:>8.1f} "
+        f"{r['p95'] * 1000:>8.1f} {r['health_p95'] * 1000:>14.1f} {r['errors']:>6}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 1)
+    async with httpx.AsyncClient(base_url=args.url, timeout=120, limits=limits) as client:
+        token: Optional[str] = args.token or await login(client, args.email, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        print(f"{args.path}  ({args.requests} requisições por nível)")
+        print_header()
+        for concurrency in args.concurrency:
+            r = await run_level(
+                client, lambda c: c.get(args.path, headers=headers), concurrency, args.requests
+            )
+            print_level(r)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Teste de carga da API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", help="JWT já emitido (dispensa login)")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument("--path", default="/api/transactions/summary")
+    parser.add_argument(
+        "--concurrency",
+        type=lambda v: [int(c) for c in v.split(",")],
+        default=[1, 4, 16, 32],
+        help="Níveis de concorrência, separados por vírgula",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Requisições por nível")
+    args = parser.parse_args()
+    if not args.token and not (args.email and args.password):
+        parser.error("informe --token ou --email e --password")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
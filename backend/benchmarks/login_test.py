@@ -0,0 +1,51 @@
+"""
+Teste de carga do login: logins por segundo sob concorrência.
+
+Cada login custa um bcrypt (BCRYPT_ROUNDS). Os hashes rodam em um pool
+limitado (PASSWORD_HASH_WORKERS), então a vazão deve crescer até o número de
+núcleos e a latência de `/api/health` não deve acompanhar a fila de logins.
+
+Uso, com o servidor rodando e um usuário já cadastrado:
+
+    python benchmarks/login_test.py --email voce@exemplo.com --password ... \\
+        --concurrency 1,4,16 --requests 64
+"""
+
+import argparse
+import asyncio
+
+import httpx
+
+from load_test import print_header, print_level, run_level
+
+
+async def main(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 1)
+    credentials = {"email": args.email, "password": args.password}
+    async with httpx.AsyncClient(base_url=args.url, timeout=120, limits=limits) as client:
+        print(f"login ({args.requests} requisições por nível)")
+        print_header("login/s")
+        for concurrency in args.concurrency:
+            r = await run_level(
+                client, lambda c: c.post("/api/auth/login/json", json=credentials), concurrency, args.requests
+            )
+            print_level(r)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Teste de carga do login")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument(
+        "--concurrency",
+        type=lambda v: [int(c) for c in v.split(",")],
+        default=[1, 4, 16],
+        help="Níveis de concorrência, separados por vírgula",
+    )
+    parser.add_argument("--requests", type=int, default=64, help="Logins por nível")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,74 @@
+"""
+ETags do cache por usuário.
+"""
+
+import time
+from uuid import uuid4
+
+from app.core.cache import MemoryCache, RedisCache, UserCache
+
+
+class FakeRedis:
+    """Stub com a interface usada pelo `RedisCache`."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return self.data[key]
+
+
+def test_etag_changes_on_write():
+    cache = UserCache(MemoryCache(ttl_seconds=60))
+    user_id = uuid4()
+    before = cache.etag(user_id, "/api/accounts?")
+
+    cache.invalidate_user(user_id)
+
+    assert cache.etag(user_id, "/api/accounts?") != before
+
+
+def test_memory_etag_expires_with_ttl(monkeypatch):
+    # Outro worker pode ter recebido a escrita: a tag não dura mais que o TTL
+    cache = UserCache(MemoryCache(ttl_seconds=60))
+    user_id = uuid4()
+    now = 1_700_000_000.0
+    monkeypatch.setattr(time, "time", lambda: now)
+    first = cache.etag(user_id, "/api/accounts?")
+
+    now += 60
+    assert cache.etag(user_id, "/api/accounts?") != first
+
+
+def test_shared_etag_is_stable_without_writes(monkeypatch):
+    cache = UserCache(RedisCache(FakeRedis(), ttl_seconds=60))
+    user_id = uuid4()
+    now = 1_700_000_000.0
+    monkeypatch.setattr(time, "time", lambda: now)
+    first = cache.etag(user_id, "/api/accounts?")
+
+    now += 3600
+    assert cache.etag(user_id, "/api/accounts?") == first
+
+
+def test_recent_write_survives_lru_eviction(monkeypatch):
+    # Leitura após escrita vai ao primário mesmo com o LRU cheio de respostas
+    cache = UserCache(MemoryCache(max_entries=4, ttl_seconds=60), sticky_seconds=5)
+    user_id = uuid4()
+    now = 1_000.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.invalidate_user(user_id)
+
+    for i in range(20):
+        cache.get_or_set(uuid4(), "dashboard", {"i": i}, lambda: {"i": i})
+
+    assert cache.recently_written(user_id)
+    now += 6
+    assert not cache.recently_written(user_id)
@@ -0,0 +1,24 @@
+"""
+ETag / If-None-Match nas rotas de transações.
+"""
+
+from app.transactions import router
+
+
+def test_listing_revalidates_with_etag(client):
+    first = client.get("/api/transactions")
+    assert first.status_code == 200
+
+    again = client.get("/api/transactions", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_export_is_not_etag_checked(client, monkeypatch):
+    # A exportação é um download em streaming: sem tag e nunca 304
+    monkeypatch.setattr(router, "export_transactions", lambda user_id, fmt, **filters: iter([b"id\n"]))
+
+    response = client.get("/api/transactions/export", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert response.content == b"id\n"
@@ -0,0 +1,74 @@
+"""
+Rollup mensal (migration 003): a carga inicial da migration e a manutenção
+feita pelo ORM a cada escrita chegam às mesmas linhas.
+"""
+
+import importlib.util
+import os
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from app.accounts.models import Account, AccountType
+from app.transactions.models import MonthlyUserCategoryTotal, TransactionStatus, TransactionType
+from app.transactions.schemas import TransactionCreate, TransactionUpdate
+from app.transactions.service import TransactionService
+
+MIGRATION = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "alembic", "versions", "003_monthly_rollup.py",
+)
+
+
+def _rollup_select() -> str:
+    spec = importlib.util.spec_from_file_location("monthly_rollup_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ROLLUP_SELECT
+
+
+def test_backfill_matches_orm_maintained_rollup(db, user):
+    account = Account(
+        user_id=user.id, name="Conta", type=AccountType.CHECKING,
+        initial_balance=Decimal("0.00"), current_balance=Decimal("0.00"),
+    )
+    db.add(account)
+    db.flush()
+
+    service = TransactionService(db)
+    created = [
+        service.create(user.id, TransactionCreate(
+            account_id=account.id, type=tx_type, description=f"Lançamento {i}",
+            amount=Decimal(amount), date=tx_date,
+        ))
+        for i, (tx_type, amount, tx_date) in enumerate([
+            (TransactionType.EXPENSE, "10.00", date(2024, 1, 5)),
+            (TransactionType.EXPENSE, "20.00", date(2024, 1, 20)),
+            (TransactionType.INCOME, "100.00", date(2024, 1, 25)),
+            (TransactionType.EXPENSE, "30.00", date(2024, 2, 3)),
+            (TransactionType.EXPENSE, "40.00", date(2024, 2, 10)),
+        ])
+    ]
+    service.update(created[1].id, user.id, TransactionUpdate(status=TransactionStatus.CANCELLED))
+    service.update(created[3].id, user.id, TransactionUpdate(amount=Decimal("35.00"), date=date(2024, 3, 1)))
+    service.delete(created[4].id, user.id)
+
+    maintained = {
+        (row.month, row.type.value, row.account_id, row.total, row.count)
+        for row in db.query(MonthlyUserCategoryTotal).filter(
+            MonthlyUserCategoryTotal.user_id == user.id,
+            MonthlyUserCategoryTotal.count > 0,  # Chaves esvaziadas por exclusão/cancelamento
+        )
+    }
+    backfilled = {
+        (row.month, row.type, row.account_id, row.total, row.count)
+        for row in db.execute(text(_rollup_select())).all()
+        if row.user_id == user.id
+    }
+
+    assert backfilled == maintained == {
+        (date(2024, 1, 1), "expense", account.id, Decimal("10.00"), 1),
+        (date(2024, 1, 1), "income", account.id, Decimal("100.00"), 1),
+        (date(2024, 3, 1), "expense", account.id, Decimal("35.00"), 1),
+    }
@@ -0,0 +1,45 @@
+"""
+Cursores de paginação (keyset): cursores malformados viram 400, não 500.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.investments.service import InvestmentService
+from app.transactions.service import TransactionService
+
+
+def _raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    key = [date(2024, 1, 5), datetime(2024, 1, 5, 10, 30), uuid4()]
+
+    assert TransactionService._decode_cursor(encode_cursor(key)) == tuple(key)
+
+
+@pytest.mark.parametrize("cursor", [
+    "não é base64",
+    _raw_cursor({"date": "2024-01-05"}),
+    _raw_cursor(["2024-01-05", "2024-01-05T10:30:00"]),
+    _raw_cursor([1, 2, 3]),
+    _raw_cursor(["2024-01-05", None, str(uuid4())]),
+])
+def test_invalid_cursor_is_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, size=3)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("decode", [TransactionService._decode_cursor, InvestmentService._decode_cursor])
+def test_cursor_with_non_text_values_is_bad_request(decode):
+    with pytest.raises(HTTPException) as error:
+        decode(_raw_cursor([1, 2, 3]))
+    assert error.value.status_code == 400
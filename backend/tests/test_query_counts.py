@@ -0,0 +1,121 @@
+"""
+Quantidade de consultas das listagens: não pode crescer com o número de linhas
+(N+1).
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.accounts.invoices import invoice_month
+from app.accounts.models import Account, AccountType, CreditCard
+from app.transactions.models import Category, Transaction, TransactionStatus, TransactionType
+
+
+def _add_transactions(db, user, count: int) -> None:
+    """Transações alternando conta e cartão, cada uma com sua categoria."""
+    account = Account(
+        user_id=user.id, name="Conta", type=AccountType.CHECKING,
+        initial_balance=Decimal("0.00"), current_balance=Decimal("0.00"),
+    )
+    card = CreditCard(user_id=user.id, name="Cartão", institution="Nubank", limit=Decimal("5000.00"), closing_day=5, due_day=12)
+    db.add_all([account, card])
+    db.flush()
+
+    for i in range(count):
+        category = Category(user_id=user.id, name=f"Categoria {i}", type=TransactionType.EXPENSE, color="#000000")
+        db.add(category)
+        db.flush()
+        db.add(Transaction(
+            user_id=user.id,
+            account_id=account.id if i % 2 else None,
+            credit_card_id=None if i % 2 else card.id,
+            category_id=category.id,
+            type=TransactionType.EXPENSE,
+            status=TransactionStatus.PAID,
+            description=f"Compra {i}",
+            amount=Decimal("10.00"),
+            date=date(2024, 1, 1) + timedelta(days=i),
+        ))
+    db.flush()
+    db.expire_all()  # Relacionamentos precisam vir da listagem, não do identity map
+    db.refresh(user)  # O usuário autenticado já vem carregado (cache de identidade)
+
+
+def _count_listing_queries(client, capture_queries) -> tuple:
+    with capture_queries() as queries:
+        response = client.get("/api/transactions", params={"limit": 500})
+    assert response.status_code == 200
+    return len(queries), response.json()
+
+
+def test_transaction_listing_query_count_is_independent_of_rows(db, user, client, capture_queries):
+    _add_transactions(db, user, 5)
+    few, body = _count_listing_queries(client, capture_queries)
+    assert len(body["transactions"]) == 5
+
+    _add_transactions(db, user, 45)
+    many, body = _count_listing_queries(client, capture_queries)
+    assert len(body["transactions"]) == 50
+    assert {t["account_name"] or t["credit_card_name"] for t in body["transactions"]} == {"Conta", "Cartão"}
+    assert all(t["category_name"] for t in body["transactions"])
+
+    # Página + totais dos filtros, com nomes de conta/cartão/categoria no mesmo SELECT
+    assert few == many <= 2
+
+
+PURCHASE_AGES = (0, 15, 40, 70)  # Dias desde cada compra pendente de um cartão
+
+
+def _add_cards(db, user, count: int) -> None:
+    """Cartões com compras pendentes na fatura atual e em faturas já fechadas."""
+    today = date.today()
+    for i in range(count):
+        card = CreditCard(
+            user_id=user.id, name=f"Cartão {i}", institution="Nubank",
+            limit=Decimal("3000.00"), closing_day=(i * 7) % 28 + 1, due_day=10,
+        )
+        db.add(card)
+        db.flush()
+        db.add_all([
+            Transaction(
+                user_id=user.id, credit_card_id=card.id, type=TransactionType.EXPENSE,
+                status=TransactionStatus.PENDING, description="Compra", amount=Decimal("25.00"),
+                date=today - timedelta(days=days),
+            )
+            for days in PURCHASE_AGES
+        ])
+    db.flush()
+    db.expire_all()
+    db.refresh(user)
+
+
+def _count_card_queries(client, capture_queries) -> tuple:
+    with capture_queries() as queries:
+        response = client.get("/api/credit-cards")
+    assert response.status_code == 200
+    return len(queries), response.json()
+
+
+def test_card_listing_query_count_is_independent_of_cards(db, user, client, capture_queries):
+    _add_cards(db, user, 1)
+    one, body = _count_card_queries(client, capture_queries)
+    assert body["total"] == 1
+
+    _add_cards(db, user, 9)
+    ten, body = _count_card_queries(client, capture_queries)
+    assert body["total"] == 10
+
+    # Fatura aberta calculada em SQL = regra de `invoice_month` em Python
+    today = date.today()
+    for card in body["cards"]:
+        current = invoice_month(today, card["closing_day"])
+        expected = sum(
+            Decimal("25.00") for days in PURCHASE_AGES
+            if invoice_month(today - timedelta(days=days), card["closing_day"]) == current
+        )
+        assert Decimal(card["current_invoice"]) == expected
+        assert Decimal(card["next_invoice"]) == 0
+        assert Decimal(card["available_limit"]) == Decimal("3000.00") - 25 * len(PURCHASE_AGES)
+
+    # Faturas e limite de todos os cartões em uma consulta agrupada
+    assert one == ten == 1
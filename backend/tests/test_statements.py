@@ -0,0 +1,61 @@
+"""
+Importação de extratos: sinal dos lançamentos de conta e de cartão.
+"""
+
+import io
+from decimal import Decimal
+from uuid import uuid4
+
+from app.integrations import IntegrationService
+from app.integrations.statements import open_statement, parse_statement
+from app.transactions.models import TransactionType
+
+
+NUBANK_CARD_CSV = b"""date,title,amount
+2024-01-05,Padaria,25.90
+2024-01-08,Pagamento recebido,-500.00
+"""
+
+CARD_OFX = b"""OFXHEADER:100
+<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240105<TRNAMT>-25.90<MEMO>Padaria</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240108<TRNAMT>500.00<MEMO>Pagamento recebido</STMTTRN>
+</BANKTRANLIST></OFX>
+"""
+
+NUBANK_ACCOUNT_CSV = """Data,Valor,Identificador,Descrição
+05/01/2024,-25.90,abc,Padaria
+08/01/2024,3000.00,def,Salário
+""".encode()
+
+
+def _rows(content: bytes, filename: str, provider: str, account_id=None, credit_card_id=None) -> list:
+    text, fmt = open_statement(io.BytesIO(content), filename)
+    return [
+        IntegrationService._statement_row(uuid4(), line, account_id, credit_card_id)
+        for line in parse_statement(text, fmt, provider)
+    ]
+
+
+def test_nubank_card_csv_imports_purchases_and_skips_payments():
+    purchase, payment = _rows(NUBANK_CARD_CSV, "fatura.csv", "nubank", credit_card_id=uuid4())
+
+    assert purchase["type"] == TransactionType.EXPENSE
+    assert purchase["amount"] == Decimal("25.90")
+    assert purchase["description"] == "Padaria"
+    assert payment is None
+
+
+def test_card_ofx_imports_purchases_and_skips_payments():
+    purchase, payment = _rows(CARD_OFX, "fatura.ofx", "nubank", credit_card_id=uuid4())
+
+    assert purchase["type"] == TransactionType.EXPENSE
+    assert purchase["amount"] == Decimal("25.90")
+    assert payment is None
+
+
+def test_account_csv_keeps_debits_and_credits():
+    debit, credit = _rows(NUBANK_ACCOUNT_CSV, "extrato.csv", "nubank", account_id=uuid4())
+
+    assert (debit["type"], debit["amount"]) == (TransactionType.EXPENSE, Decimal("25.90"))
+    assert (credit["type"], credit["amount"]) == (TransactionType.INCOME, Decimal("3000.00"))
@@ -0,0 +1,86 @@
+"""
+Regressão dos índices de transações (migration 002): as consultas quentes do
+repository devem usar os índices compostos/parciais, não varrer a tabela.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.transactions.models import Transaction, TransactionStatus, TransactionType
+from app.transactions.repository import TransactionRepository
+from app.users.models import User
+
+USERS = 20
+TRANSACTIONS_PER_USER = 500
+
+
+@pytest.fixture
+def seeded(db, user):
+    """`user` e outros 19 usuários com 500 transações cada, de 2023 a 2024."""
+    others = [
+        User(email=f"outro-{i}-{user.id.hex[:8]}@exemplo.com", password_hash="x", name="Outro")
+        for i in range(USERS - 1)
+    ]
+    db.add_all(others)
+    db.flush()
+
+    # Inserção pelo ORM: os rótulos de tipo/status são os que a aplicação grava
+    db.execute(insert(Transaction), [
+        {
+            "user_id": owner.id,
+            "type": TransactionType.INCOME if g % 3 == 0 else TransactionType.EXPENSE,
+            "status": TransactionStatus.CANCELLED if g % 10 == 0 else TransactionStatus.PAID,
+            "description": f"tx {g}",
+            "amount": Decimal(g % 500 + 1),
+            "date": date(2023, 1, 1) + timedelta(days=g % 730),
+        }
+        for owner in [user, *others]
+        for g in range(1, TRANSACTIONS_PER_USER + 1)
+    ])
+    db.execute(text("ANALYZE users"))
+    db.execute(text("ANALYZE transactions"))
+    return user
+
+
+def _plan(db, capture_queries, run) -> str:
+    """Plano (EXPLAIN) da última consulta executada por `run`."""
+    with capture_queries() as queries:
+        run()
+    statement, parameters = queries[-1]
+    rows = db.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+    return "\n".join(row[0] for row in rows)
+
+
+def test_listing_uses_user_date_index(db, seeded, capture_queries):
+    repo = TransactionRepository(db)
+
+    plan = _plan(db, capture_queries, lambda: repo.get_all_by_user(seeded.id, limit=100))
+
+    assert "ix_transactions_user_date_created" in plan
+    assert "Seq Scan on transactions" not in plan
+
+
+def test_totals_by_type_use_partial_index(db, seeded, capture_queries):
+    repo = TransactionRepository(db)
+
+    # Intervalo que não é de meses completos: lido das transações, não do rollup
+    plan = _plan(db, capture_queries, lambda: repo.get_totals_by_type(
+        seeded.id, date(2023, 3, 10), date(2023, 9, 20)
+    ))
+
+    assert "ix_transactions_user_type_date_active" in plan or "ix_transactions_user_date_active" in plan
+    assert "Seq Scan on transactions" not in plan
+
+
+def test_daily_flow_uses_partial_index(db, seeded, capture_queries):
+    repo = TransactionRepository(db)
+
+    plan = _plan(db, capture_queries, lambda: repo.get_daily_flow(
+        seeded.id, date(2023, 3, 10), date(2023, 9, 20)
+    ))
+
+    assert "ix_transactions_user_date_active" in plan
+    assert "Seq Scan on transactions" not in plan
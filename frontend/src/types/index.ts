@@ -143,9 +143,10 @@ export interface TransactionCreate {
 export interface TransactionListResponse {
   transactions: Transaction[];
   total: number;
-  total_income: number;
-  total_expense: number;
-  balance: number;
+  total_income: number | null;
+  total_expense: number | null;
+  balance: number | null;
+  next_cursor?: string | null;
 }
 
 export interface TransactionFilters {
@@ -156,6 +157,9 @@ export interface TransactionFilters {
   account_id?: string;
   credit_card_id?: string;
   category_id?: string;
+  limit?: number;
+  cursor?: string;
+  include_totals?: boolean;
 }
 
 // ===========================================